@@ -5,26 +5,28 @@ FastAPI Backend Server
 from fastapi import FastAPI, UploadFile, File, Form, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, JSONResponse
-from pydantic import BaseModel
+from fastapi.responses import HTMLResponse, ORJSONResponse, StreamingResponse
+from pydantic import BaseModel, ConfigDict
 from typing import Optional, List
+import asyncio
+import json
 import os
 import uuid
-import shutil
-from dotenv import load_dotenv
+from pathlib import Path
 
+import aiofiles
+
+# Environment variables are loaded once when core is imported
 from core import AITutor
 from processors import DocumentProcessor
 from utils import FileValidator, InputValidator, ResponseFormatter
 
-# Load environment variables
-load_dotenv()
-
 # Initialize FastAPI app
 app = FastAPI(
     title="AI Study Buddy",
     description="AI-powered personal tutor for comprehensive learning",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
@@ -46,25 +48,51 @@ os.makedirs(PROCESSED_FOLDER, exist_ok=True)
 MAX_FILE_SIZE = int(os.getenv('MAX_FILE_SIZE', 10))
 FileValidator.set_max_file_size(MAX_FILE_SIZE)
 
+# Chunk size for streaming uploads to disk (1 MB)
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
 # Initialize components
 ai_tutor = AITutor()
 doc_processor = DocumentProcessor(
     tesseract_path=os.getenv('TESSERACT_PATH')
 )
 
+# Cap concurrent LLM calls so bursts don't trip provider rate limits
+LLM_CONCURRENCY = int(os.getenv('LLM_CONCURRENCY', 8))
+llm_semaphore = asyncio.Semaphore(LLM_CONCURRENCY)
+
+
+async def run_llm_call(func, *args, **kwargs):
+    """Run a blocking AI tutor call in a worker thread
+
+    The AI clients are synchronous, so calling them directly from an
+    async endpoint would block the event loop and serialize all
+    concurrent requests. to_thread keeps the loop responsive.
+    """
+    async with llm_semaphore:
+        return await asyncio.to_thread(func, *args, **kwargs)
+
 # Pydantic models for request/response
+# extra='forbid' keeps validation on Pydantic v2's fast path and rejects
+# unknown fields instead of silently dropping them
 class QuestionRequest(BaseModel):
+    model_config = ConfigDict(extra='forbid')
+
     question: str
     material_id: Optional[str] = None
     level: Optional[str] = "intermediate"
 
 
 class SimplerRequest(BaseModel):
+    model_config = ConfigDict(extra='forbid')
+
     original_explanation: str
     question: str
 
 
 class NotesRequest(BaseModel):
+    model_config = ConfigDict(extra='forbid')
+
     material_id: str
     subject: Optional[str] = None
     level: Optional[str] = "intermediate"
@@ -72,6 +100,8 @@ class NotesRequest(BaseModel):
 
 
 class QuizRequest(BaseModel):
+    model_config = ConfigDict(extra='forbid')
+
     material_id: str
     num_questions: Optional[int] = 5
     difficulty: Optional[str] = "mixed"
@@ -79,9 +109,28 @@ class QuizRequest(BaseModel):
 
 
 class MultipleApproachesRequest(BaseModel):
+    model_config = ConfigDict(extra='forbid')
+
     concept: str
 
 
+class StudyPackRequest(BaseModel):
+    model_config = ConfigDict(extra='forbid')
+
+    material_id: str
+    subject: Optional[str] = None
+    level: Optional[str] = "intermediate"
+    focus: Optional[str] = "concept-oriented"
+    num_questions: Optional[int] = 5
+    difficulty: Optional[str] = "mixed"
+
+
+@app.on_event("startup")
+async def warmup():
+    """Warm the AI client at boot so the first request skips setup costs"""
+    await asyncio.to_thread(ai_tutor.warmup)
+
+
 # API Endpoints
 
 @app.get("/", response_class=HTMLResponse)
@@ -127,21 +176,39 @@ async def upload_file(
         # Generate unique ID
         material_id = str(uuid.uuid4())
         
-        # Save uploaded file
-        file_extension = os.path.splitext(file.filename)[1]
+        # Reject unsupported formats before any bytes hit the disk
+        file_extension = os.path.splitext(file.filename)[1].lower()
+        if file_extension not in FileValidator.SUPPORTED_EXTENSIONS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unsupported file format: {file_extension}"
+            )
+
         file_path = os.path.join(UPLOAD_FOLDER, f"{material_id}{file_extension}")
-        
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
-        # Validate file
-        validation = FileValidator.validate_file(file_path)
-        if not validation['valid']:
+
+        # Stream upload to disk in chunks so the event loop never blocks
+        # on file I/O, and bail out early if the file is too large.
+        # Extension and size are checked in this single pass, so no
+        # separate validation re-read of the file is needed afterwards
+        bytes_written = 0
+        async with aiofiles.open(file_path, "wb") as buffer:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                bytes_written += len(chunk)
+                if bytes_written > FileValidator.MAX_FILE_SIZE:
+                    break
+                await buffer.write(chunk)
+
+        if bytes_written > FileValidator.MAX_FILE_SIZE:
             os.remove(file_path)
-            raise HTTPException(status_code=400, detail=validation['error'])
-        
-        # Process file
-        processed_content = doc_processor.process_file(file_path, extract_structure=True)
+            raise HTTPException(
+                status_code=400,
+                detail=f"File too large (max: {MAX_FILE_SIZE} MB)"
+            )
+
+        # Process file (CPU-bound parsing/OCR, keep it off the event loop)
+        processed_content = await doc_processor.process_file_async(
+            file_path, extract_structure=True
+        )
         
         if not processed_content['success']:
             os.remove(file_path)
@@ -222,7 +289,8 @@ async def generate_notes(request: NotesRequest):
         
         # Generate notes
         print(f"Generating notes for material: {request.material_id}")
-        result = ai_tutor.generate_study_notes(
+        result = await run_llm_call(
+            ai_tutor.generate_study_notes,
             material_id=request.material_id,
             subject=request.subject,
             level=request.level,
@@ -249,6 +317,43 @@ async def generate_notes(request: NotesRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/generate-notes/stream")
+async def generate_notes_stream(request: NotesRequest):
+    """
+    Generate study notes and stream them as Server-Sent Events
+
+    Emits `data: {"delta": ...}` events as tokens arrive, then a final
+    `data: [DONE]` event. Cache hits arrive as a single delta.
+
+    - **material_id**: ID of uploaded material
+    - **subject**: Subject area (optional)
+    - **level**: Academic level (beginner/intermediate/advanced)
+    - **focus**: Focus type (concept-oriented/exam-oriented)
+    """
+    level_validation = InputValidator.validate_level(request.level)
+    if not level_validation['valid']:
+        request.level = level_validation['default']
+
+    focus_validation = InputValidator.validate_focus(request.focus)
+    if not focus_validation['valid']:
+        request.focus = focus_validation['default']
+
+    def event_stream():
+        try:
+            for delta in ai_tutor.generate_study_notes_stream(
+                material_id=request.material_id,
+                subject=request.subject,
+                level=request.level,
+                focus=request.focus
+            ):
+                yield f"data: {json.dumps({'delta': delta})}\n\n"
+            yield "data: [DONE]\n\n"
+        except Exception as e:
+            yield f"data: {json.dumps({'error': str(e)})}\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
 @app.post("/api/ask")
 async def ask_question(request: QuestionRequest):
     """
@@ -270,7 +375,8 @@ async def ask_question(request: QuestionRequest):
             raise HTTPException(status_code=400, detail="Question cannot be empty")
         
         # Get explanation
-        result = ai_tutor.ask_question(
+        result = await run_llm_call(
+            ai_tutor.ask_question,
             question=question,
             material_id=request.material_id,
             level=request.level
@@ -287,6 +393,46 @@ async def ask_question(request: QuestionRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/ask/stream")
+async def ask_question_stream(request: QuestionRequest):
+    """
+    Ask a question and stream the explanation as Server-Sent Events
+
+    Emits `data: {"delta": ...}` events as tokens arrive, then a final
+    `data: [DONE]` event. Cuts time-to-first-token from full generation
+    time to the provider's first chunk.
+
+    - **question**: The question to ask
+    - **material_id**: ID of related material for context (optional)
+    - **level**: Student level (beginner/intermediate/advanced)
+    """
+    # Validate level
+    level_validation = InputValidator.validate_level(request.level)
+    if not level_validation['valid']:
+        request.level = level_validation['default']
+
+    # Sanitize question
+    question = InputValidator.sanitize_text(request.question, max_length=1000)
+    if not question:
+        raise HTTPException(status_code=400, detail="Question cannot be empty")
+
+    def event_stream():
+        try:
+            for delta in ai_tutor.ask_question_stream(
+                question=question,
+                material_id=request.material_id,
+                level=request.level
+            ):
+                yield f"data: {json.dumps({'delta': delta})}\n\n"
+            yield "data: [DONE]\n\n"
+        except Exception as e:
+            yield f"data: {json.dumps({'error': str(e)})}\n\n"
+
+    # Starlette iterates the sync generator in a threadpool, so the
+    # blocking AI client never runs on the event loop
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
 @app.post("/api/explain-simpler")
 async def explain_simpler(request: SimplerRequest):
     """
@@ -296,7 +442,8 @@ async def explain_simpler(request: SimplerRequest):
     - **question**: Original question
     """
     try:
-        result = ai_tutor.request_simpler_explanation(
+        result = await run_llm_call(
+            ai_tutor.request_simpler_explanation,
             original_explanation=request.original_explanation,
             question=request.question
         )
@@ -324,7 +471,7 @@ async def multiple_approaches(request: MultipleApproachesRequest):
         if not concept:
             raise HTTPException(status_code=400, detail="Concept cannot be empty")
         
-        result = ai_tutor.explain_multiple_ways(concept)
+        result = await run_llm_call(ai_tutor.explain_multiple_ways, concept)
         
         if not result['success']:
             raise HTTPException(status_code=400, detail=result.get('error'))
@@ -358,7 +505,8 @@ async def generate_quiz(request: QuizRequest):
             request.difficulty = difficulty_validation['default']
         
         # Generate quiz
-        result = ai_tutor.generate_practice_quiz(
+        result = await run_llm_call(
+            ai_tutor.generate_practice_quiz,
             material_id=request.material_id,
             num_questions=request.num_questions,
             difficulty=request.difficulty,
@@ -376,22 +524,84 @@ async def generate_quiz(request: QuizRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/study-pack")
+async def generate_study_pack(request: StudyPackRequest):
+    """
+    Generate notes, a practice quiz, and a key-ideas summary in one call
+
+    The three generations run concurrently server-side, so the pack
+    takes as long as the slowest section instead of all three in
+    sequence. Each section carries its own success flag.
+
+    - **material_id**: ID of uploaded material
+    - **subject**: Subject area (optional)
+    - **level**: Academic level (beginner/intermediate/advanced)
+    - **focus**: Focus type for the notes (concept-oriented/exam-oriented)
+    - **num_questions**: Number of quiz questions (1-20)
+    - **difficulty**: Quiz difficulty (easy/medium/hard/mixed)
+    """
+    try:
+        # Validate inputs
+        level_validation = InputValidator.validate_level(request.level)
+        if not level_validation['valid']:
+            request.level = level_validation['default']
+
+        focus_validation = InputValidator.validate_focus(request.focus)
+        if not focus_validation['valid']:
+            request.focus = focus_validation['default']
+
+        num_validation = InputValidator.validate_num_questions(request.num_questions)
+        if not num_validation['valid']:
+            request.num_questions = num_validation['default']
+
+        difficulty_validation = InputValidator.validate_difficulty(request.difficulty)
+        if not difficulty_validation['valid']:
+            request.difficulty = difficulty_validation['default']
+
+        result = await run_llm_call(
+            ai_tutor.generate_study_pack,
+            material_id=request.material_id,
+            subject=request.subject,
+            level=request.level,
+            focus=request.focus,
+            num_questions=request.num_questions,
+            difficulty=request.difficulty
+        )
+
+        if not result['success']:
+            raise HTTPException(status_code=400, detail=result.get('error'))
+
+        # Format notes
+        if result['notes'].get('success'):
+            result['notes']['notes'] = ResponseFormatter.format_notes(
+                result['notes']['notes']
+            )
+
+        return result
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.delete("/api/material/{material_id}")
 async def delete_material(material_id: str):
     """Delete an uploaded material"""
     try:
-        # Check if material exists
-        if material_id not in ai_tutor.materials:
-            raise HTTPException(status_code=404, detail="Material not found")
-        
         # Delete from AI tutor
-        del ai_tutor.materials[material_id]
-        
-        # Delete files
-        for ext in FileValidator.SUPPORTED_EXTENSIONS:
-            file_path = os.path.join(UPLOAD_FOLDER, f"{material_id}{ext}")
-            if os.path.exists(file_path):
-                os.remove(file_path)
+        meta = ai_tutor.remove_material(material_id)
+        if meta is None:
+            raise HTTPException(status_code=404, detail="Material not found")
+
+        # Delete file; the index knows the extension so a single unlink
+        # usually suffices. Glob only as a fallback — it touches just
+        # the files that exist instead of stat-ing every extension
+        if meta.ext:
+            Path(UPLOAD_FOLDER, f"{material_id}{meta.ext}").unlink(missing_ok=True)
+        else:
+            for path in Path(UPLOAD_FOLDER).glob(f"{material_id}.*"):
+                path.unlink(missing_ok=True)
         
         return {
             "success": True,
@@ -408,7 +618,7 @@ async def delete_material(material_id: str):
 async def get_supported_formats():
     """Get list of supported file formats"""
     return {
-        "formats": FileValidator.SUPPORTED_EXTENSIONS,
+        "formats": FileValidator.SUPPORTED_EXTENSIONS_LIST,
         "max_file_size_mb": MAX_FILE_SIZE
     }
 
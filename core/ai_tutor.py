@@ -1,11 +1,59 @@
 """Main AI Tutor orchestrator"""
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property, lru_cache
+from typing import Dict, List, NamedTuple, Optional
+import hashlib
 import os
+import re
+import httpx
 from dotenv import load_dotenv
 
+from utils.cache import LRUCache
+
 from .note_generator import NoteGenerator
 from .question_gen import QuestionGenerator
 from .explainer import ConceptExplainer
+from .llm_cache import LLMCache
+
+# Parse .env once per process, not once per AITutor instance
+load_dotenv()
+
+
+# Tokenizer and stopword list for lightweight lexical retrieval over
+# material chunks (see AITutor._relevant_context)
+_WORD_RE = re.compile(r'[a-z0-9]+')
+_STOPWORDS = frozenset({
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'can', 'do', 'does',
+    'explain', 'for', 'from', 'how', 'in', 'is', 'it', 'me', 'of', 'on',
+    'or', 'that', 'the', 'this', 'to', 'what', 'when', 'where', 'which',
+    'why', 'with', 'you'
+})
+
+
+@lru_cache(maxsize=1)
+def _shared_http_client() -> httpx.Client:
+    """
+    Process-wide HTTP client for provider SDKs
+
+    Both the OpenAI and Anthropic SDKs accept an external http_client;
+    sharing one pool means TLS handshakes amortize across requests and
+    re-instantiating AITutor doesn't tear down warm connections.
+    """
+    # 600s matches both SDKs' own defaults; anything shorter cuts off
+    # long non-streamed generations (notes at max_tokens=4000 can take
+    # minutes) that send no bytes until the completion finishes
+    return httpx.Client(
+        timeout=httpx.Timeout(600.0),
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=50)
+    )
+
+
+class MaterialMeta(NamedTuple):
+    """Per-material metadata computed once when the material is added"""
+    format: Optional[str]
+    file_name: Optional[str]
+    content_length: int
+    ext: Optional[str]
 
 
 class AITutor:
@@ -20,24 +68,89 @@ class AITutor:
             provider: AI provider (openai or anthropic)
             model: Model name to use
         """
-        load_dotenv()
-        
         self.provider = provider or os.getenv('AI_PROVIDER', 'openai')
         self.api_key = api_key or self._get_api_key()
         self.model = model or self._get_default_model()
-        
-        # Initialize AI client
-        self.ai_client = self._init_ai_client()
-        
-        # Initialize components with model name
-        self.note_generator = NoteGenerator(self.ai_client, self.model)
-        self.question_generator = QuestionGenerator(self.ai_client, self.model)
-        self.explainer = ConceptExplainer(self.ai_client, self.model)
-        
-        # Storage for processed materials
+
+        # Storage for processed materials, plus a lightweight metadata
+        # index so listings don't rescan the full content dicts
         self.materials = {}
-        self.notes_cache = {}
+        self._index = {}
+        self.notes_cache = LRUCache(maxsize=128)
+
+    @cached_property
+    def ai_client(self):
+        """AI client, constructed lazily on first use"""
+        return self._init_ai_client()
+
+    @cached_property
+    def _disk_cache(self):
+        """Disk-backed notes cache that survives process restarts"""
+        from diskcache import Cache
+        return Cache(
+            os.getenv('NOTES_CACHE_DIR', '.notes_cache'),
+            size_limit=int(1e9),
+            eviction_policy='least-frequently-used'
+        )
+
+    @cached_property
+    def _materials_store(self):
+        """Shared disk-backed material store
+
+        diskcache is safe for concurrent access from multiple processes,
+        so materials uploaded on one uvicorn worker are visible to the
+        others (and survive restarts).
+        """
+        from diskcache import Cache
+        return Cache(
+            os.getenv('MATERIALS_STORE_DIR', '.materials_store'),
+            size_limit=int(1e9)
+        )
+
+    @cached_property
+    def _llm_cache(self) -> LLMCache:
+        """Exact-match response cache shared by the generators"""
+        return LLMCache()
+
+    @cached_property
+    def note_generator(self) -> NoteGenerator:
+        """Note generator, constructed lazily on first use"""
+        return NoteGenerator(self.ai_client, self.model, cache=self._llm_cache)
+
+    @cached_property
+    def question_generator(self) -> QuestionGenerator:
+        """Question generator, constructed lazily on first use"""
+        return QuestionGenerator(self.ai_client, self.model, cache=self._llm_cache)
+
+    @cached_property
+    def explainer(self) -> ConceptExplainer:
+        """Concept explainer, constructed lazily on first use"""
+        return ConceptExplainer(self.ai_client, self.model, cache=self._llm_cache)
     
+    def warmup(self) -> bool:
+        """
+        Warm one-time lazy state before serving traffic
+
+        Constructs the AI client and generators (TLS/session setup) and
+        pings the provider so the first user request doesn't pay these
+        costs. Failures are swallowed — warming up is best-effort.
+
+        Returns:
+            True if the warmup completed, False otherwise
+        """
+        try:
+            client = self.ai_client
+            _ = (self.note_generator, self.question_generator, self.explainer)
+
+            # Cheap authenticated call to establish the connection pool
+            if hasattr(client, 'models'):
+                client.models.list()
+
+            return True
+        except Exception as e:
+            print(f"Warmup skipped: {e}")
+            return False
+
     def _get_api_key(self) -> str:
         """Get API key from environment"""
         if self.provider == 'openai':
@@ -72,13 +185,20 @@ class AITutor:
             if self.api_key.startswith('sk-or-v1-'):
                 return OpenAI(
                     api_key=self.api_key,
-                    base_url="https://openrouter.ai/api/v1"
+                    base_url="https://openrouter.ai/api/v1",
+                    http_client=_shared_http_client()
                 )
             else:
-                return OpenAI(api_key=self.api_key)
+                return OpenAI(
+                    api_key=self.api_key,
+                    http_client=_shared_http_client()
+                )
         elif self.provider == 'anthropic':
             from anthropic import Anthropic
-            return Anthropic(api_key=self.api_key)
+            return Anthropic(
+                api_key=self.api_key,
+                http_client=_shared_http_client()
+            )
         else:
             raise ValueError(f"Unsupported provider: {self.provider}")
     
@@ -93,14 +213,69 @@ class AITutor:
         Returns:
             Confirmation dictionary
         """
+        # Pre-chunk the text once so question answering can retrieve
+        # relevant windows instead of shipping the whole document
+        full_text = content.get('full_text', '')
+        if full_text and 'context_chunks' not in content:
+            content['context_chunks'] = self._chunk_text(full_text)
+
         self.materials[material_id] = content
-        
+
+        file_path = content.get('file_path', '')
+        self._index[material_id] = MaterialMeta(
+            format=content.get('format'),
+            file_name=content.get('metadata', {}).get('file_name'),
+            content_length=len(content.get('full_text', '')),
+            ext=os.path.splitext(file_path)[1] or None
+        )
+
+        # Mirror into the shared store so other workers see the upload
+        try:
+            self._materials_store.set(material_id, content)
+        except Exception as e:
+            print(f"Materials store write failed: {e}")
+
         return {
             'success': True,
             'material_id': material_id,
             'message': 'Material added successfully'
         }
     
+    def _get_material(self, material_id: str) -> Optional[Dict[str, any]]:
+        """
+        Look up a material locally, falling back to the shared store
+
+        A hit from the store (e.g. the upload happened on another
+        worker) is hydrated into the local dict and index so subsequent
+        lookups are in-memory.
+
+        Args:
+            material_id: ID of the material
+
+        Returns:
+            The material content dict, or None if not found
+        """
+        material = self.materials.get(material_id)
+        if material is not None:
+            return material
+
+        try:
+            material = self._materials_store.get(material_id)
+        except Exception:
+            return None
+
+        if material is not None:
+            self.materials[material_id] = material
+            file_path = material.get('file_path', '')
+            self._index[material_id] = MaterialMeta(
+                format=material.get('format'),
+                file_name=material.get('metadata', {}).get('file_name'),
+                content_length=len(material.get('full_text', '')),
+                ext=os.path.splitext(file_path)[1] or None
+            )
+
+        return material
+
     def generate_study_notes(
         self,
         material_id: str,
@@ -120,26 +295,38 @@ class AITutor:
         Returns:
             Generated notes
         """
-        if material_id not in self.materials:
+        material = self._get_material(material_id)
+        if material is None:
             return {
                 'success': False,
                 'error': 'Material not found'
             }
-        
-        material = self.materials[material_id]
+
         content = material.get('full_text', '')
-        
+
         if not content:
             return {
                 'success': False,
                 'error': 'No content found in material'
             }
-        
-        # Check cache
-        cache_key = f"{material_id}_{subject}_{level}_{focus}"
+
+        # Check cache; tuple keys hash natively in C and can't collide
+        # the way '_'-joined strings can when a field contains '_'
+        cache_key = (material_id, subject, level, focus)
         if cache_key in self.notes_cache:
             return self.notes_cache[cache_key]
-        
+
+        # Check the disk cache; keyed by content hash, so it also hits
+        # when the same document is re-uploaded under a new material_id
+        disk_key = self._notes_disk_key(content, subject, level, focus)
+        try:
+            cached = self._disk_cache.get(disk_key)
+        except Exception:
+            cached = None
+        if cached is not None:
+            self.notes_cache[cache_key] = cached
+            return cached
+
         # Generate notes
         result = self.note_generator.generate_notes(
             content=content,
@@ -147,12 +334,92 @@ class AITutor:
             level=level,
             focus=focus
         )
-        
+
         # Cache result
         if result['success']:
             self.notes_cache[cache_key] = result
-        
+            try:
+                self._disk_cache.set(disk_key, result)
+            except Exception as e:
+                print(f"Notes disk cache write failed: {e}")
+
         return result
+
+    def generate_study_notes_stream(
+        self,
+        material_id: str,
+        subject: Optional[str] = None,
+        level: str = "intermediate",
+        focus: str = "concept-oriented"
+    ):
+        """
+        Generate study notes, streaming the text as it is generated
+
+        Cached results (memory or disk) are yielded as a single chunk.
+        Streamed generations are stored in both caches on completion.
+
+        Args:
+            material_id: ID of the material
+            subject: Subject area
+            level: Academic level
+            focus: Focus type
+
+        Yields:
+            Notes text chunks
+        """
+        material = self._get_material(material_id)
+        if material is None:
+            raise ValueError('Material not found')
+
+        content = material.get('full_text', '')
+        if not content:
+            raise ValueError('No content found in material')
+
+        cache_key = (material_id, subject, level, focus)
+        if cache_key in self.notes_cache:
+            yield self.notes_cache[cache_key]['notes']
+            return
+
+        disk_key = self._notes_disk_key(content, subject, level, focus)
+        try:
+            cached = self._disk_cache.get(disk_key)
+        except Exception:
+            cached = None
+        if cached is not None:
+            self.notes_cache[cache_key] = cached
+            yield cached['notes']
+            return
+
+        parts = []
+        for delta in self.note_generator.generate_notes_stream(
+            content=content, subject=subject, level=level, focus=focus
+        ):
+            parts.append(delta)
+            yield delta
+
+        notes = ''.join(parts)
+        result = {
+            'success': True,
+            'notes': notes,
+            'metadata': {
+                'subject': subject,
+                'level': level,
+                'focus': focus,
+                'word_count': len(notes.split())
+            }
+        }
+        self.notes_cache[cache_key] = result
+        try:
+            self._disk_cache.set(disk_key, result)
+        except Exception as e:
+            print(f"Notes disk cache write failed: {e}")
+
+    @staticmethod
+    def _notes_disk_key(content: str, subject: Optional[str], level: str, focus: str) -> str:
+        """Content-hash key for the persistent notes cache"""
+        digest = hashlib.blake2b(content.encode('utf-8'), digest_size=16)
+        digest.update(f"|{subject}|{level}|{focus}".encode('utf-8'))
+        return digest.hexdigest()
     
     def ask_question(
         self,
@@ -173,15 +440,115 @@ class AITutor:
         """
         # Get context if material provided
         context = None
-        if material_id and material_id in self.materials:
-            context = self.materials[material_id].get('full_text', '')
-        
+        if material_id:
+            material = self._get_material(material_id)
+            if material is not None:
+                context = self._relevant_context(material, question)
+
         return self.explainer.explain_concept(
             question=question,
             context=context,
             level=level
         )
     
+    def ask_question_stream(
+        self,
+        question: str,
+        material_id: Optional[str] = None,
+        level: str = "intermediate"
+    ):
+        """
+        Answer a student's question, streaming the explanation
+
+        Args:
+            question: The student's question
+            material_id: Optional material ID for context
+            level: Student level
+
+        Yields:
+            Explanation text chunks as they are generated
+        """
+        context = None
+        if material_id:
+            material = self._get_material(material_id)
+            if material is not None:
+                context = self._relevant_context(material, question)
+
+        yield from self.explainer.explain_concept_stream(
+            question=question,
+            context=context,
+            level=level
+        )
+
+    @staticmethod
+    def _chunk_text(text: str, chunk_size: int = 1000, overlap: int = 150) -> List[str]:
+        """
+        Split text into overlapping character windows
+
+        Args:
+            text: Text to split
+            chunk_size: Window size in characters
+            overlap: Overlap between consecutive windows
+
+        Returns:
+            List of text chunks
+        """
+        if len(text) <= chunk_size:
+            return [text]
+
+        chunks = []
+        step = chunk_size - overlap
+        for start in range(0, len(text), step):
+            chunk = text[start:start + chunk_size]
+            if chunk.strip():
+                chunks.append(chunk)
+            if start + chunk_size >= len(text):
+                break
+
+        return chunks
+
+    @staticmethod
+    def _relevant_context(material: Dict[str, any], question: str, top_k: int = 4) -> str:
+        """
+        Select the material chunks most relevant to a question
+
+        Scores chunks by overlap with the question's content words and
+        joins the best ones in document order, so the LLM sees the
+        relevant parts of a large document instead of a blind prefix.
+
+        Args:
+            material: Material content dict
+            question: The student's question
+            top_k: Maximum number of chunks to include
+
+        Returns:
+            Context string for the LLM
+        """
+        chunks = material.get('context_chunks')
+        if not chunks:
+            return material.get('full_text', '')
+        if len(chunks) <= top_k:
+            return '\n\n'.join(chunks)
+
+        query_words = set(_WORD_RE.findall(question.lower())) - _STOPWORDS
+        if not query_words:
+            return '\n\n'.join(chunks[:top_k])
+
+        scored = []
+        for position, chunk in enumerate(chunks):
+            chunk_words = set(_WORD_RE.findall(chunk.lower()))
+            score = len(query_words & chunk_words)
+            scored.append((score, position))
+
+        best = sorted(scored, reverse=True)[:top_k]
+        if best[0][0] == 0:
+            # Nothing matched; fall back to the document opening
+            return '\n\n'.join(chunks[:top_k])
+
+        # Keep selected chunks in document order for readability
+        selected = sorted(position for score, position in best if score > 0)
+        return '\n\n'.join(chunks[position] for position in selected)
+
     def request_simpler_explanation(
         self,
         original_explanation: str,
@@ -221,28 +588,122 @@ class AITutor:
         Returns:
             Quiz questions with solutions
         """
-        if material_id not in self.materials:
+        material = self._get_material(material_id)
+        if material is None:
             return {
                 'success': False,
                 'error': 'Material not found'
             }
-        
-        material = self.materials[material_id]
+
         content = material.get('full_text', '')
-        
+
         if not content:
             return {
                 'success': False,
                 'error': 'No content found in material'
             }
-        
-        return self.question_generator.generate_questions(
+
+        return self.question_generator.generate_questions_parallel(
             content=content,
             subject=subject,
             num_questions=num_questions,
             difficulty=difficulty
         )
-    
+
+    def generate_study_pack(
+        self,
+        material_id: str,
+        subject: Optional[str] = None,
+        level: str = "intermediate",
+        focus: str = "concept-oriented",
+        num_questions: int = 5,
+        difficulty: str = "mixed"
+    ) -> Dict[str, any]:
+        """
+        Generate notes, a practice quiz, and a key-ideas summary at once
+
+        The three generations are independent LLM calls, so they run
+        concurrently and the pack takes as long as the slowest one
+        instead of all three back-to-back. Partial failures are
+        tolerated: each section carries its own success flag.
+
+        Args:
+            material_id: ID of the material
+            subject: Subject area
+            level: Academic level
+            focus: Focus type for the notes
+            num_questions: Number of quiz questions
+            difficulty: Quiz difficulty level
+
+        Returns:
+            Dictionary with notes, quiz, and summary sections
+        """
+        material = self._get_material(material_id)
+        if material is None:
+            return {
+                'success': False,
+                'error': 'Material not found'
+            }
+
+        if not material.get('full_text', ''):
+            return {
+                'success': False,
+                'error': 'No content found in material'
+            }
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            notes_future = executor.submit(
+                self.generate_study_notes,
+                material_id=material_id, subject=subject,
+                level=level, focus=focus
+            )
+            quiz_future = executor.submit(
+                self.generate_practice_quiz,
+                material_id=material_id, num_questions=num_questions,
+                difficulty=difficulty, subject=subject
+            )
+            summary_future = executor.submit(
+                self.ask_question,
+                question="Summarize the key ideas of this material",
+                material_id=material_id, level=level
+            )
+
+            notes = notes_future.result()
+            quiz = quiz_future.result()
+            summary = summary_future.result()
+
+        return {
+            'success': any(
+                section.get('success') for section in (notes, quiz, summary)
+            ),
+            'notes': notes,
+            'quiz': quiz,
+            'summary': summary
+        }
+
+    def remove_material(self, material_id: str) -> Optional[MaterialMeta]:
+        """
+        Remove a material and its index entry
+
+        Args:
+            material_id: ID of the material
+
+        Returns:
+            The material's MaterialMeta, or None if not found
+        """
+        if self._get_material(material_id) is None:
+            return None
+
+        del self.materials[material_id]
+        meta = self._index.pop(material_id, None)
+
+        try:
+            self._materials_store.delete(material_id)
+        except Exception:
+            pass
+
+        return meta or MaterialMeta(None, None, 0, None)
+
     def explain_multiple_ways(self, concept: str) -> Dict[str, any]:
         """
         Explain a concept using multiple approaches
@@ -265,21 +726,23 @@ class AITutor:
         Returns:
             Material summary
         """
-        if material_id not in self.materials:
+        material = self._get_material(material_id)
+        if material is None:
             return {
                 'success': False,
                 'error': 'Material not found'
             }
-        
-        material = self.materials[material_id]
-        
+
+        meta = self._index.get(material_id)
+
         return {
             'success': True,
             'material_id': material_id,
             'format': material.get('format'),
             'metadata': material.get('metadata', {}),
             'has_structure': 'structured_content' in material,
-            'content_length': len(material.get('full_text', ''))
+            # Length is computed once at add_material time
+            'content_length': meta.content_length if meta else len(material.get('full_text', ''))
         }
     
     def list_materials(self) -> List[Dict[str, any]]:
@@ -289,12 +752,20 @@ class AITutor:
         Returns:
             List of material summaries
         """
+        # Hydrate anything other workers have added to the shared store
+        try:
+            for material_id in self._materials_store:
+                if material_id not in self._index:
+                    self._get_material(material_id)
+        except Exception:
+            pass
+
         return [
             {
                 'material_id': mat_id,
-                'format': mat.get('format'),
-                'file_name': mat.get('metadata', {}).get('file_name'),
-                'content_length': len(mat.get('full_text', ''))
+                'format': meta.format,
+                'file_name': meta.file_name,
+                'content_length': meta.content_length
             }
-            for mat_id, mat in self.materials.items()
+            for mat_id, meta in self._index.items()
         ]
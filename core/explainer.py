@@ -1,48 +1,36 @@
 """Concept explainer with adaptive difficulty"""
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional
 
-
-class ConceptExplainer:
-    """Explains concepts with multiple approaches and adaptive difficulty"""
-    
-    def __init__(self, ai_client, model_name='openai/gpt-4o-mini'):
-        """
-        Initialize concept explainer
-        
-        Args:
-            ai_client: AI client (OpenAI or Anthropic)
-            model_name: Model name to use
-        """
-        self.ai_client = ai_client
-        self.model_name = model_name
-        self.explanation_history = []
-    
-    def explain_concept(
-        self,
-        question: str,
-        context: Optional[str] = None,
-        level: str = "intermediate",
-        previous_attempts: Optional[List[str]] = None
-    ) -> Dict[str, any]:
-        """
-        Explain a concept or answer a question
-        
-        Args:
-            question: The student's question
-            context: Relevant study material context
-            level: Student level (beginner/intermediate/advanced)
-            previous_attempts: Previous explanations that didn't work
-            
-        Returns:
-            Dictionary containing the explanation
-        """
-        
-        # Build context about previous attempts
-        retry_context = ""
-        if previous_attempts:
-            retry_context = f"""
+from utils.cache import LRUCache
+
+from .llm_cache import LLMCache
+from .provider import compose_context_system, make_provider
+from .tokens import truncate_tokens
+
+# Normalization for the paraphrase cache: lowercase, strip punctuation,
+# and drop the filler students prepend to otherwise identical questions
+_NON_ALNUM_RE = re.compile(r'[^a-z0-9 ]+')
+_WS_RE = re.compile(r'\s+')
+_QUESTION_PREFIXES = (
+    'can you explain to me',
+    'can you explain',
+    'please explain',
+    'tell me about',
+    'what is',
+    'what are',
+    'explain',
+    'define',
+    'describe',
+)
+
+# Prompt bodies live at module level so each call only pays for
+# format_map interpolation, not rebuilding the template string
+RETRY_TEMPLATE = """
 **Previous Explanations (student still confused):**
-{chr(10).join(f"Attempt {i+1}: {attempt[:200]}..." for i, attempt in enumerate(previous_attempts[-2:]))}
+{attempts}
 
 The student is still confused, so try a DIFFERENT approach:
 - Use simpler language
@@ -51,21 +39,70 @@ The student is still confused, so try a DIFFERENT approach:
 - Break it down into smaller steps
 """
 
-        context_section = f"""
-**Relevant Study Material:**
-{context[:2000]}
-""" if context else ""
-
-        prompt = f"""You are a patient, friendly Study Buddy helping a student understand a concept.
-
-**Student's Question:**
+EXPLAIN_TEMPLATE = """**Student's Question:**
 {question}
 
 **Student Level:** {level}
+{retry_context}"""
 
-{context_section}
+SIMPLER_TEMPLATE = """A student asked: "{question}"
 
-{retry_context}
+You provided this explanation:
+{original_explanation}
+
+But the student is STILL confused and needs it explained MUCH simpler.
+
+**Provide an extremely simple explanation:**
+
+1. **Use the ELI5 (Explain Like I'm 5) approach**
+   - Pretend you're explaining to a young child
+   - Use only simple, everyday words
+   - Very short sentences
+
+2. **Use a concrete story or scenario**
+   - Make it visual and tangible
+   - Use familiar objects or situations
+
+3. **Break it into tiny steps**
+   - One small idea at a time
+   - Check understanding after each step
+
+4. **More analogies**
+   - Compare to things everyone knows
+   - Make it fun and memorable
+
+**Remember:** This student is struggling, so be extra patient, extra clear, and extra encouraging!
+"""
+
+# One focused prompt per approach so the three explanations can be
+# generated concurrently instead of serially in one long response
+APPROACH_PROMPTS = (
+    ('Visual/Spatial', """Explain this concept using visual descriptions, diagrams in words, and spatial relationships:
+
+**Concept:** {concept}
+
+Make the explanation complete and self-contained. Students learn differently, and this visual perspective should stand on its own."""),
+    ('Logical/Step-by-Step', """Explain this concept using logical reasoning, cause-and-effect, and a step-by-step breakdown:
+
+**Concept:** {concept}
+
+Make the explanation complete and self-contained. Students learn differently, and this logical perspective should stand on its own."""),
+    ('Analogy/Story', """Explain this concept using a relatable story or extended analogy:
+
+**Concept:** {concept}
+
+Make the explanation complete and self-contained. Students learn differently, and this narrative perspective should stand on its own."""),
+)
+
+
+class ConceptExplainer:
+    """Explains concepts with multiple approaches and adaptive difficulty"""
+
+    # The full instruction scaffolding lives in the system prompt so
+    # every call shares the same static prefix; only the short, variable
+    # user message changes. OpenAI's automatic prompt caching reuses the
+    # computed prefix across calls, cutting TTFT and input cost.
+    SYSTEM_PROMPT = """You are a patient, friendly Study Buddy who excels at explaining complex concepts in simple, clear ways. You never assume prior knowledge and always break things down step-by-step.
 
 **Provide a comprehensive explanation following this structure:**
 
@@ -127,16 +164,85 @@ If the student asks for a simpler explanation, focus MORE on:
 - More analogies
 """
 
-        try:
-            response = self._get_ai_response(prompt)
+    def __init__(self, ai_client, model_name='openai/gpt-4o-mini', cache: Optional[LLMCache] = None):
+        """
+        Initialize concept explainer
+
+        Args:
+            ai_client: AI client (OpenAI or Anthropic)
+            model_name: Model name to use
+            cache: Optional exact-match response cache
+        """
+        self.ai_client = ai_client
+        self.model_name = model_name
+        # Resolve the provider dispatch once instead of probing the
+        # client's attributes on every call
+        self._provider = make_provider(ai_client, model_name)
+        self.cache = cache
+        # Bounded so a long-lived server instance doesn't accumulate
+        # every explanation it has ever produced
+        self.explanation_history = deque(maxlen=50)
+        # Paraphrase cache: "what is photosynthesis?" and "explain
+        # photosynthesis" normalize to the same key and share one answer
+        self._question_cache = LRUCache(maxsize=256)
+    
+    def explain_concept(
+        self,
+        question: str,
+        context: Optional[str] = None,
+        level: str = "intermediate",
+        previous_attempts: Optional[List[str]] = None
+    ) -> Dict[str, any]:
+        """
+        Explain a concept or answer a question
+        
+        Args:
+            question: The student's question
+            context: Relevant study material context
+            level: Student level (beginner/intermediate/advanced)
+            previous_attempts: Previous explanations that didn't work
             
+        Returns:
+            Dictionary containing the explanation
+        """
+        
+        # Material context is sent as a stable prefix message (see
+        # _get_ai_response) so repeat questions on the same material can
+        # reuse the provider's prompt cache
+        context_prefix = truncate_tokens(context, 2000) if context else None
+        prompt = self._build_explain_prompt(question, level, previous_attempts)
+
+        # Retries must produce a fresh attempt, so paraphrase hits only
+        # apply to first-time questions
+        question_key = None
+        if previous_attempts is None:
+            question_key = (self._normalize_question(question), level, context_prefix)
+            cached = self._question_cache.get(question_key)
+            if cached is not None:
+                return {
+                    'success': True,
+                    'explanation': cached,
+                    'metadata': {
+                        'level': level,
+                        'has_context': context is not None,
+                        'is_retry': False,
+                        'word_count': len(cached.split())
+                    }
+                }
+
+        try:
+            response = self._get_ai_response(prompt, context_prefix=context_prefix)
+
+            if question_key is not None:
+                self._question_cache[question_key] = response
+
             # Store in history
             self.explanation_history.append({
                 'question': question,
                 'level': level,
                 'response': response
             })
-            
+
             return {
                 'success': True,
                 'explanation': response,
@@ -147,13 +253,106 @@ If the student asks for a simpler explanation, focus MORE on:
                     'word_count': len(response.split())
                 }
             }
-            
+
         except Exception as e:
             return {
                 'success': False,
                 'error': str(e)
             }
-    
+
+    def explain_concept_stream(
+        self,
+        question: str,
+        context: Optional[str] = None,
+        level: str = "intermediate"
+    ):
+        """
+        Explain a concept, streaming the response as it is generated
+
+        Args:
+            question: The student's question
+            context: Relevant study material context
+            level: Student level (beginner/intermediate/advanced)
+
+        Yields:
+            Explanation text chunks
+        """
+        context_prefix = truncate_tokens(context, 2000) if context else None
+        prompt = self._build_explain_prompt(question, level)
+
+        parts = []
+        for delta in self._stream_ai_response(prompt, context_prefix=context_prefix):
+            parts.append(delta)
+            yield delta
+
+        # Store the assembled response in history
+        self.explanation_history.append({
+            'question': question,
+            'level': level,
+            'response': ''.join(parts)
+        })
+
+    @staticmethod
+    def _normalize_question(question: str) -> str:
+        """
+        Normalize a question so near-identical phrasings share a cache key
+
+        Lowercases, strips punctuation, collapses whitespace, and drops a
+        leading filler phrase ("what is", "explain", ...), so "What is
+        photosynthesis?" and "explain photosynthesis" both map to
+        "photosynthesis".
+
+        Args:
+            question: The student's question
+
+        Returns:
+            Normalized question string
+        """
+        normalized = _NON_ALNUM_RE.sub(' ', question.lower())
+        normalized = _WS_RE.sub(' ', normalized).strip()
+
+        for prefix in _QUESTION_PREFIXES:
+            if normalized.startswith(prefix + ' '):
+                normalized = normalized[len(prefix) + 1:]
+                break
+
+        return normalized
+
+    def _build_explain_prompt(
+        self,
+        question: str,
+        level: str,
+        previous_attempts: Optional[List[str]] = None
+    ) -> str:
+        """
+        Build the explanation prompt
+
+        Args:
+            question: The student's question
+            level: Student level
+            previous_attempts: Previous explanations that didn't work
+
+        Returns:
+            The assembled prompt string
+        """
+        # Build context about previous attempts
+        retry_context = ""
+        if previous_attempts:
+            attempts = '\n'.join(
+                f"Attempt {i+1}: {attempt[:200]}..."
+                for i, attempt in enumerate(previous_attempts[-2:])
+            )
+            retry_context = RETRY_TEMPLATE.format_map({'attempts': attempts})
+
+        # All static scaffolding lives in SYSTEM_PROMPT; this only
+        # carries what changes per request, keeping the shared prefix
+        # cacheable
+        return EXPLAIN_TEMPLATE.format_map({
+            'question': question,
+            'level': level,
+            'retry_context': retry_context
+        })
+
     def explain_simpler(self, original_explanation: str, question: str) -> Dict[str, any]:
         """
         Provide an even simpler explanation
@@ -166,37 +365,14 @@ If the student asks for a simpler explanation, focus MORE on:
             Simplified explanation
         """
         
-        prompt = f"""A student asked: "{question}"
-
-You provided this explanation:
-{original_explanation[:1500]}
-
-But the student is STILL confused and needs it explained MUCH simpler.
-
-**Provide an extremely simple explanation:**
-
-1. **Use the ELI5 (Explain Like I'm 5) approach**
-   - Pretend you're explaining to a young child
-   - Use only simple, everyday words
-   - Very short sentences
-
-2. **Use a concrete story or scenario**
-   - Make it visual and tangible
-   - Use familiar objects or situations
-
-3. **Break it into tiny steps**
-   - One small idea at a time
-   - Check understanding after each step
-
-4. **More analogies**
-   - Compare to things everyone knows
-   - Make it fun and memorable
-
-**Remember:** This student is struggling, so be extra patient, extra clear, and extra encouraging!
-"""
+        prompt = SIMPLER_TEMPLATE.format_map({
+            'question': question,
+            'original_explanation': truncate_tokens(original_explanation, 1000)
+        })
 
         try:
-            response = self._get_ai_response(prompt)
+            # Retries should produce a fresh attempt, never a cached one
+            response = self._get_ai_response(prompt, use_cache=False)
             
             return {
                 'success': True,
@@ -224,60 +400,101 @@ But the student is STILL confused and needs it explained MUCH simpler.
             Dictionary with multiple explanations
         """
         
-        prompt = f"""Explain this concept in 3 DIFFERENT ways:
-
-**Concept:** {concept}
-
-**Approach 1: Visual/Spatial**
-[Explain using visual descriptions, diagrams in words, spatial relationships]
-
-**Approach 2: Logical/Step-by-Step**
-[Explain using logical reasoning, cause-and-effect, step-by-step breakdown]
-
-**Approach 3: Analogy/Story**
-[Explain using a relatable story or extended analogy]
-
-Make each approach complete and self-contained. Students learn differently, so these different perspectives should help!
-"""
+        prompts = [
+            template.format_map({'concept': concept})
+            for _, template in APPROACH_PROMPTS
+        ]
 
         try:
-            response = self._get_ai_response(prompt)
-            
+            # One call per approach, in parallel: wall-clock time is the
+            # slowest explanation instead of all three back-to-back
+            with ThreadPoolExecutor(max_workers=len(prompts)) as executor:
+                responses = list(executor.map(
+                    lambda p: self._get_ai_response(p, max_tokens=1000),
+                    prompts
+                ))
+
+            response = '\n\n'.join(
+                f"**Approach {i}: {name}**\n\n{text}"
+                for i, ((name, _), text) in enumerate(zip(APPROACH_PROMPTS, responses), 1)
+            )
+
             return {
                 'success': True,
                 'approaches': response,
                 'metadata': {
-                    'num_approaches': 3,
+                    'num_approaches': len(prompts),
                     'word_count': len(response.split())
                 }
             }
-            
+
         except Exception as e:
             return {
                 'success': False,
                 'error': str(e)
             }
     
-    def _get_ai_response(self, prompt: str) -> str:
-        """Get response from AI client"""
-        if hasattr(self.ai_client, 'chat'):
-            # OpenAI
-            response = self.ai_client.chat.completions.create(
-                model=self.model_name,
-                messages=[
-                    {"role": "system", "content": "You are a patient, friendly tutor who excels at explaining complex concepts in simple, clear ways. You never assume prior knowledge and always break things down step-by-step."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=3000
-            )
-            return response.choices[0].message.content
-        else:
-            # Anthropic
-            response = self.ai_client.messages.create(
-                model="claude-3-opus-20240229",
-                max_tokens=3000,
-                messages=[{"role": "user", "content": prompt}],
-                system="You are a patient, friendly tutor who excels at explaining complex concepts in simple, clear ways. You never assume prior knowledge and always break things down step-by-step."
+    def _get_ai_response(
+        self,
+        prompt: str,
+        context_prefix: Optional[str] = None,
+        use_cache: bool = True,
+        max_tokens: int = 3000
+    ) -> str:
+        """
+        Get response from AI client
+
+        Args:
+            prompt: The user prompt to send
+            context_prefix: Optional study-material context. Sent before
+                the variable prompt so identical material forms a stable
+                prefix the provider's prompt cache can reuse across calls
+            use_cache: Whether the exact-match cache may serve this call
+            max_tokens: Response token budget
+
+        Returns:
+            AI response text
+        """
+        cache_key = None
+        if use_cache and self.cache is not None:
+            cache_key = LLMCache.make_key(
+                self.model_name, 0.7,
+                compose_context_system(self.SYSTEM_PROMPT, context_prefix),
+                prompt
             )
-            return response.content[0].text
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        response_text = self._provider.complete(
+            prompt,
+            self.SYSTEM_PROMPT,
+            max_tokens=max_tokens,
+            temperature=0.7,
+            context_prefix=context_prefix
+        )
+
+        if cache_key is not None:
+            self.cache.set(cache_key, response_text)
+
+        return response_text
+
+    def _stream_ai_response(self, prompt: str, context_prefix: Optional[str] = None):
+        """
+        Stream response text chunks from AI client
+
+        Args:
+            prompt: The user prompt to send
+            context_prefix: Optional study-material context (see
+                _get_ai_response)
+
+        Yields:
+            Response text chunks as they arrive
+        """
+        yield from self._provider.stream(
+            prompt,
+            self.SYSTEM_PROMPT,
+            max_tokens=3000,
+            temperature=0.7,
+            context_prefix=context_prefix
+        )
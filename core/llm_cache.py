@@ -0,0 +1,80 @@
+"""Exact-match cache for LLM responses"""
+import hashlib
+import os
+from typing import Optional
+
+from utils.cache import LRUCache
+
+# Cached responses expire after 30 days
+DEFAULT_TTL = 30 * 24 * 3600
+
+
+class LLMCache:
+    """Exact-match response cache shared by the generators
+
+    Two tiers: an in-memory LRU for hot repeats within a process, and a
+    disk-backed diskcache store so hits survive restarts and are shared
+    across workers. Keys are a hash of everything that determines the
+    response: model, temperature, system prompt, and user prompt.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        maxsize: int = 256,
+        ttl: int = DEFAULT_TTL
+    ):
+        """
+        Initialize the cache
+
+        Args:
+            directory: Disk cache directory (defaults to LLM_CACHE_DIR
+                env var or .llm_cache)
+            maxsize: Maximum entries in the in-memory tier
+            ttl: Disk entry lifetime in seconds
+        """
+        self.ttl = ttl
+        self._memory = LRUCache(maxsize=maxsize)
+        self._directory = directory or os.getenv('LLM_CACHE_DIR', '.llm_cache')
+        self._disk = None
+
+    @property
+    def disk(self):
+        """Disk tier, opened lazily on first use"""
+        if self._disk is None:
+            from diskcache import Cache
+            self._disk = Cache(self._directory, size_limit=int(5e8))
+        return self._disk
+
+    @staticmethod
+    def make_key(model: str, temperature: float, system: str, prompt: str) -> str:
+        """Build a cache key from everything that determines the response"""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{model}|{temperature}|".encode('utf-8'))
+        digest.update(system.encode('utf-8'))
+        digest.update(b'|')
+        digest.update(prompt.encode('utf-8'))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Look up a cached response; None on miss"""
+        response = self._memory.get(key)
+        if response is not None:
+            return response
+
+        try:
+            response = self.disk.get(key)
+        except Exception:
+            return None
+
+        if response is not None:
+            self._memory[key] = response
+        return response
+
+    def set(self, key: str, response: str):
+        """Store a response in both tiers"""
+        self._memory[key] = response
+        try:
+            self.disk.set(key, response, expire=self.ttl)
+        except Exception as e:
+            print(f"LLM cache write failed: {e}")
@@ -1,49 +1,50 @@
 """Study notes generator with structured formatting"""
 from typing import Dict, List, Optional
 
+from .llm_cache import LLMCache
+from .provider import make_provider
 
-class NoteGenerator:
-    """Generates structured study notes from content"""
-    
-    def __init__(self, ai_client, model_name='openai/gpt-4o-mini'):
-        """
-        Initialize note generator
-        
-        Args:
-            ai_client: AI client (OpenAI or Anthropic)
-            model_name: Model name to use
-        """
-        self.ai_client = ai_client
-        self.model_name = model_name
-    
-    def generate_notes(
-        self,
-        content: str,
-        subject: Optional[str] = None,
-        level: Optional[str] = "intermediate",
-        focus: Optional[str] = "concept-oriented"
-    ) -> Dict[str, any]:
-        """
-        Generate comprehensive study notes from content
-        
-        Args:
-            content: The study material content
-            subject: Subject area (e.g., "Mathematics", "Biology")
-            level: Academic level (beginner/intermediate/advanced)
-            focus: Focus type (concept-oriented/exam-oriented)
-            
-        Returns:
-            Dictionary containing structured notes
-        """
-        
-        prompt = f"""You are an expert Study Buddy and Personal Tutor. Your job is to transform the following study material into clear, comprehensive study notes.
+# Prompt bodies live at module level so each call only pays for
+# format_map interpolation, not rebuilding the template string
+NOTES_TEMPLATE = """**Student Level:** {level}
+**Subject:** {subject}
+**Focus:** {focus}
 
 **Study Material:**
 {content}
+"""
+
+SECTION_TEMPLATE = """Generate detailed study notes for this specific section:
 
+**Section Title:** {section_title}
+**Subject:** {subject}
 **Student Level:** {level}
-**Subject:** {subject or "General"}
-**Focus:** {focus}
+
+**Content:**
+{section_content}
+
+Provide:
+1. Simple definition/introduction
+2. Step-by-step detailed explanation (assume beginner)
+3. At least one concrete example
+4. A real-life analogy
+5. ⭐ Important points to remember
+6. 🧠 Key formulas/terms
+7. ⚠️ Common mistakes
+8. Brief summary
+9. Memory trick
+
+Be thorough but clear. Use simple language first, then technical terms."""
+
+
+class NoteGenerator:
+    """Generates structured study notes from content"""
+
+    # The full instruction scaffolding lives in the system prompt so
+    # every call shares the same static prefix; only the short, variable
+    # user message changes. OpenAI's automatic prompt caching reuses the
+    # computed prefix across calls, cutting TTFT and input cost.
+    SYSTEM_PROMPT = """You are an expert Study Buddy and Personal Tutor. Your job is to transform the student's study material into clear, comprehensive study notes.
 
 **Generate study notes following this structure:**
 
@@ -53,27 +54,27 @@ class NoteGenerator:
 
 3. **Detailed Sections** (For each major concept):
    ### Concept Name
-   
+
    **Simple Definition:**
    [Easy-to-understand definition in plain language]
-   
+
    **Detailed Explanation:**
    [Step-by-step breakdown, assuming beginner knowledge]
    [Use simple language first, then introduce technical terms]
-   
+
    **Example:**
    [Concrete example with real numbers/scenarios]
-   
+
    **Real-Life Analogy:**
    [Relatable comparison to everyday experience]
-   
+
    ⭐ **Important Points:**
    - Key point 1
    - Key point 2
-   
+
    🧠 **Formula/Keywords:**
    [Any formulas, definitions, or key terms to memorize]
-   
+
    ⚠️ **Common Mistakes:**
    - Mistake 1 and why it's wrong
    - Mistake 2 and how to avoid it
@@ -99,9 +100,46 @@ class NoteGenerator:
 - Assume student may be learning this for the first time
 """
 
+    def __init__(self, ai_client, model_name='openai/gpt-4o-mini', cache: Optional[LLMCache] = None):
+        """
+        Initialize note generator
+
+        Args:
+            ai_client: AI client (OpenAI or Anthropic)
+            model_name: Model name to use
+            cache: Optional exact-match response cache
+        """
+        self.ai_client = ai_client
+        self.model_name = model_name
+        # Resolve the provider dispatch once instead of probing the
+        # client's attributes on every call
+        self._provider = make_provider(ai_client, model_name)
+        self.cache = cache
+
+    def generate_notes(
+        self,
+        content: str,
+        subject: Optional[str] = None,
+        level: Optional[str] = "intermediate",
+        focus: Optional[str] = "concept-oriented"
+    ) -> Dict[str, any]:
+        """
+        Generate comprehensive study notes from content
+        
+        Args:
+            content: The study material content
+            subject: Subject area (e.g., "Mathematics", "Biology")
+            level: Academic level (beginner/intermediate/advanced)
+            focus: Focus type (concept-oriented/exam-oriented)
+            
+        Returns:
+            Dictionary containing structured notes
+        """
+        prompt = self._build_notes_prompt(content, subject, level, focus)
+
         try:
             response = self._get_ai_response(prompt)
-            
+
             return {
                 'success': True,
                 'notes': response,
@@ -112,13 +150,54 @@ class NoteGenerator:
                     'word_count': len(response.split())
                 }
             }
-            
+
         except Exception as e:
             return {
                 'success': False,
                 'error': str(e)
             }
-    
+
+    def generate_notes_stream(
+        self,
+        content: str,
+        subject: Optional[str] = None,
+        level: Optional[str] = "intermediate",
+        focus: Optional[str] = "concept-oriented"
+    ):
+        """
+        Generate study notes, streaming the response as it is generated
+
+        Args:
+            content: The study material content
+            subject: Subject area
+            level: Academic level
+            focus: Focus type
+
+        Yields:
+            Notes text chunks
+        """
+        prompt = self._build_notes_prompt(content, subject, level, focus)
+        yield from self._stream_ai_response(prompt)
+
+    def _build_notes_prompt(
+        self,
+        content: str,
+        subject: Optional[str],
+        level: Optional[str],
+        focus: Optional[str]
+    ) -> str:
+        """Build the variable portion of the notes-generation prompt
+
+        All static scaffolding lives in SYSTEM_PROMPT; this only carries
+        what changes per request, keeping the shared prefix cacheable.
+        """
+        return NOTES_TEMPLATE.format_map({
+            'level': level,
+            'subject': subject or "General",
+            'focus': focus,
+            'content': content
+        })
+
     def generate_section_notes(
         self,
         section_content: str,
@@ -139,27 +218,12 @@ class NoteGenerator:
             Formatted notes for the section
         """
         
-        prompt = f"""Generate detailed study notes for this specific section:
-
-**Section Title:** {section_title}
-**Subject:** {subject or "General"}
-**Student Level:** {level}
-
-**Content:**
-{section_content}
-
-Provide:
-1. Simple definition/introduction
-2. Step-by-step detailed explanation (assume beginner)
-3. At least one concrete example
-4. A real-life analogy
-5. ⭐ Important points to remember
-6. 🧠 Key formulas/terms
-7. ⚠️ Common mistakes
-8. Brief summary
-9. Memory trick
-
-Be thorough but clear. Use simple language first, then technical terms."""
+        prompt = SECTION_TEMPLATE.format_map({
+            'section_title': section_title,
+            'subject': subject or "General",
+            'level': level,
+            'section_content': section_content
+        })
 
         try:
             return self._get_ai_response(prompt)
@@ -176,28 +240,38 @@ Be thorough but clear. Use simple language first, then technical terms."""
         Returns:
             AI response text
         """
-        # This will be implemented based on the AI client type
-        # Placeholder implementation
-        if hasattr(self.ai_client, 'chat'):
-            # OpenAI style
-            response = self.ai_client.chat.completions.create(
-                model=self.model_name,
-                messages=[
-                    {"role": "system", "content": "You are an expert study tutor who creates clear, structured, and comprehensive study notes."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=4000
-            )
-            return response.choices[0].message.content
-        else:
-            # Anthropic style
-            response = self.ai_client.messages.create(
-                model="claude-3-opus-20240229",
-                max_tokens=4000,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ],
-                system="You are an expert study tutor who creates clear, structured, and comprehensive study notes."
-            )
-            return response.content[0].text
+        cache_key = None
+        if self.cache is not None:
+            cache_key = LLMCache.make_key(self.model_name, 0.7, self.SYSTEM_PROMPT, prompt)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        response_text = self._provider.complete(
+            prompt,
+            self.SYSTEM_PROMPT,
+            max_tokens=4000,
+            temperature=0.7
+        )
+
+        if cache_key is not None:
+            self.cache.set(cache_key, response_text)
+
+        return response_text
+
+    def _stream_ai_response(self, prompt: str):
+        """
+        Stream response text chunks from AI client
+
+        Args:
+            prompt: The prompt to send
+
+        Yields:
+            Response text chunks as they arrive
+        """
+        yield from self._provider.stream(
+            prompt,
+            self.SYSTEM_PROMPT,
+            max_tokens=4000,
+            temperature=0.7
+        )
@@ -0,0 +1,221 @@
+"""Provider strategy objects wrapping the AI clients"""
+from typing import Dict, List, Optional
+
+# Fixed model used on the Anthropic path
+ANTHROPIC_MODEL = "claude-3-opus-20240229"
+
+
+def compose_context_system(system: str, context_prefix: Optional[str]) -> str:
+    """
+    Append study-material context to a system prompt
+
+    Used both for the Anthropic system string and for cache keys, so the
+    context always affects the response identity the same way.
+
+    Args:
+        system: The static system prompt
+        context_prefix: Optional study-material context
+
+    Returns:
+        The composed system string
+    """
+    if context_prefix:
+        return f"{system}\n\n**Relevant Study Material:**\n{context_prefix}"
+    return system
+
+
+class OpenAIProvider:
+    """Dispatches requests through an OpenAI-style chat client"""
+
+    def __init__(self, client, model_name: str):
+        """
+        Initialize the provider
+
+        Args:
+            client: OpenAI client instance
+            model_name: Model name to use
+        """
+        self.client = client
+        self.model_name = model_name
+
+    @staticmethod
+    def _build_messages(
+        prompt: str,
+        system: str,
+        context_prefix: Optional[str]
+    ) -> List[Dict[str, str]]:
+        """Build the message list with a stable context prefix
+
+        The context rides in its own system message between the static
+        system prompt and the variable user prompt, so repeat questions
+        on the same material share a cacheable prefix.
+        """
+        messages = [{"role": "system", "content": system}]
+        if context_prefix:
+            messages.append({
+                "role": "system",
+                "content": f"**Relevant Study Material:**\n{context_prefix}"
+            })
+        messages.append({"role": "user", "content": prompt})
+        return messages
+
+    def complete(
+        self,
+        prompt: str,
+        system: str,
+        max_tokens: int,
+        temperature: float,
+        context_prefix: Optional[str] = None,
+        response_format: Optional[Dict[str, str]] = None
+    ) -> str:
+        """
+        Issue a completion call and return the response text
+
+        Args:
+            prompt: The user prompt
+            system: The system prompt
+            max_tokens: Response token budget
+            temperature: Sampling temperature
+            context_prefix: Optional study-material context
+            response_format: Optional response_format (e.g. JSON mode)
+
+        Returns:
+            Response text
+        """
+        kwargs = {}
+        if response_format is not None:
+            kwargs['response_format'] = response_format
+
+        response = self.client.chat.completions.create(
+            model=self.model_name,
+            messages=self._build_messages(prompt, system, context_prefix),
+            temperature=temperature,
+            max_tokens=max_tokens,
+            **kwargs
+        )
+        return response.choices[0].message.content
+
+    def stream(
+        self,
+        prompt: str,
+        system: str,
+        max_tokens: int,
+        temperature: float,
+        context_prefix: Optional[str] = None
+    ):
+        """
+        Issue a streaming call, yielding response text chunks
+
+        Args:
+            prompt: The user prompt
+            system: The system prompt
+            max_tokens: Response token budget
+            temperature: Sampling temperature
+            context_prefix: Optional study-material context
+
+        Yields:
+            Response text chunks as they arrive
+        """
+        stream = self.client.chat.completions.create(
+            model=self.model_name,
+            messages=self._build_messages(prompt, system, context_prefix),
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True
+        )
+        for chunk in stream:
+            delta = chunk.choices[0].delta.content
+            if delta:
+                yield delta
+
+
+class AnthropicProvider:
+    """Dispatches requests through an Anthropic messages client"""
+
+    def __init__(self, client, model_name: str):
+        """
+        Initialize the provider
+
+        Args:
+            client: Anthropic client instance
+            model_name: Unused; the Anthropic path pins ANTHROPIC_MODEL
+        """
+        self.client = client
+        self.model_name = model_name
+
+    def complete(
+        self,
+        prompt: str,
+        system: str,
+        max_tokens: int,
+        temperature: float,
+        context_prefix: Optional[str] = None,
+        response_format: Optional[Dict[str, str]] = None
+    ) -> str:
+        """
+        Issue a completion call and return the response text
+
+        Args:
+            prompt: The user prompt
+            system: The system prompt
+            max_tokens: Response token budget
+            temperature: Sampling temperature
+            context_prefix: Optional study-material context
+            response_format: Ignored; the messages API has no JSON mode
+
+        Returns:
+            Response text
+        """
+        response = self.client.messages.create(
+            model=ANTHROPIC_MODEL,
+            max_tokens=max_tokens,
+            messages=[{"role": "user", "content": prompt}],
+            system=compose_context_system(system, context_prefix)
+        )
+        return response.content[0].text
+
+    def stream(
+        self,
+        prompt: str,
+        system: str,
+        max_tokens: int,
+        temperature: float,
+        context_prefix: Optional[str] = None
+    ):
+        """
+        Issue a streaming call, yielding response text chunks
+
+        Args:
+            prompt: The user prompt
+            system: The system prompt
+            max_tokens: Response token budget
+            temperature: Sampling temperature
+            context_prefix: Optional study-material context
+
+        Yields:
+            Response text chunks as they arrive
+        """
+        with self.client.messages.stream(
+            model=ANTHROPIC_MODEL,
+            max_tokens=max_tokens,
+            messages=[{"role": "user", "content": prompt}],
+            system=compose_context_system(system, context_prefix)
+        ) as stream:
+            for text in stream.text_stream:
+                yield text
+
+
+def make_provider(ai_client, model_name: str):
+    """
+    Resolve the provider strategy for a client, once
+
+    Args:
+        ai_client: AI client (OpenAI or Anthropic)
+        model_name: Model name to use
+
+    Returns:
+        OpenAIProvider or AnthropicProvider wrapping the client
+    """
+    if hasattr(ai_client, 'chat'):
+        return OpenAIProvider(ai_client, model_name)
+    return AnthropicProvider(ai_client, model_name)
@@ -1,72 +1,62 @@
 """Practice question generator with solutions"""
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 import json
+import re
 
+from .llm_cache import LLMCache
+from .provider import make_provider
+from .tokens import truncate_tokens
 
-class QuestionGenerator:
-    """Generates practice questions with detailed solutions"""
-    
-    def __init__(self, ai_client, model_name='openai/gpt-4o-mini'):
-        """
-        Initialize question generator
-        
-        Args:
-            ai_client: AI client (OpenAI or Anthropic)
-            model_name: Model name to use
-        """
-        self.ai_client = ai_client
-        self.model_name = model_name
-    
-    def generate_questions(
-        self,
-        content: str,
-        subject: Optional[str] = None,
-        num_questions: int = 5,
-        difficulty: Optional[str] = "mixed"
-    ) -> Dict[str, any]:
-        """
-        Generate practice questions from content
-        
-        Args:
-            content: The study material content
-            subject: Subject area
-            num_questions: Number of questions to generate
-            difficulty: Difficulty level (easy/medium/hard/mixed)
-            
-        Returns:
-            Dictionary containing questions and solutions
-        """
-        
-        difficulty_distribution = {
-            'easy': {'easy': num_questions, 'medium': 0, 'hard': 0},
-            'medium': {'easy': 0, 'medium': num_questions, 'hard': 0},
-            'hard': {'easy': 0, 'medium': 0, 'hard': num_questions},
-            'mixed': {
-                'easy': num_questions // 3 + (1 if num_questions % 3 > 0 else 0),
-                'medium': num_questions // 3 + (1 if num_questions % 3 > 1 else 0),
-                'hard': num_questions // 3
-            }
-        }
-        
-        dist = difficulty_distribution.get(difficulty, difficulty_distribution['mixed'])
-        
-        # Limit content length to avoid token limits
-        prompt = f"""You are an expert tutor creating practice questions for students.
+# Matches a response wrapped in markdown fences, capturing the payload
+_JSON_FENCE_RE = re.compile(r'^\s*```(?:json)?\s*(.*?)\s*```\s*$', re.DOTALL)
 
+# Prompt bodies live at module level so each call only pays for
+# format_map interpolation, not rebuilding the template string
+QUESTIONS_TEMPLATE = """**Subject:** {subject}
+**Difficulty Distribution:**
+- Easy Questions: {easy}
+- Medium Questions: {medium}
+- Hard Questions: {hard}
+{batch}
 **Study Material:**
-{content[:3000]}
+{content}
+"""
 
-**Subject:** {subject or "General"}
-**Difficulty Distribution:**
-- Easy Questions: {dist['easy']}
-- Medium Questions: {dist['medium']}
-- Hard Questions: {dist['hard']}
+# Marks each fan-out batch so sub-prompts are never byte-identical:
+# otherwise the exact-match response cache would hand every same-sized
+# batch of one difficulty the same questions
+BATCH_LINE = "**Batch:** {part} of {total} -- cover different aspects of the material than the other batches"
 
-**Generate practice questions following this EXACT JSON format:**
+SINGLE_QUESTION_TEMPLATE = """Create ONE {difficulty} difficulty {question_type} question about: {topic}
 
+Return in this JSON format:
 {{
+  "question": "Question text?",
+  "type": "{question_type}",
+  "options": ["A) Option 1", "B) Option 2", "C) Option 3", "D) Option 4"],
+  "correct_answer": "Correct option",
+  "explanation": "Detailed step-by-step solution",
+  "hints": ["Hint 1", "Hint 2"]
+}}
+
+Make it exam-relevant and include a thorough explanation."""
+
+
+class QuestionGenerator:
+    """Generates practice questions with detailed solutions"""
+
+    # The full instruction scaffolding lives in the system prompt so
+    # every call shares the same static prefix; only the short, variable
+    # user message changes. OpenAI's automatic prompt caching reuses the
+    # computed prefix across calls, cutting TTFT and input cost.
+    SYSTEM_PROMPT = """You are an expert tutor creating practice questions with detailed solutions for students.
+
+**Generate practice questions following this EXACT JSON format:**
+
+{
   "questions": [
-    {{
+    {
       "id": 1,
       "difficulty": "easy",
       "question": "Question text here?",
@@ -76,9 +66,9 @@ class QuestionGenerator:
       "explanation": "Step 1: [First step of solution]\\nStep 2: [Second step]\\nStep 3: [Final answer with reasoning]",
       "key_concept": "Main concept being tested",
       "hints": ["Hint 1 if student is stuck", "Hint 2 for additional help"]
-    }}
+    }
   ]
-}}
+}
 
 **Question Types to Use:**
 - multiple_choice (most common)
@@ -106,22 +96,78 @@ class QuestionGenerator:
 **Return ONLY valid JSON, no additional text.**
 """
 
+    def __init__(self, ai_client, model_name='openai/gpt-4o-mini', cache: Optional[LLMCache] = None):
+        """
+        Initialize question generator
+
+        Args:
+            ai_client: AI client (OpenAI or Anthropic)
+            model_name: Model name to use
+            cache: Optional exact-match response cache
+        """
+        self.ai_client = ai_client
+        self.model_name = model_name
+        # Resolve the provider dispatch once instead of probing the
+        # client's attributes on every call
+        self._provider = make_provider(ai_client, model_name)
+        self.cache = cache
+
+    def generate_questions(
+        self,
+        content: str,
+        subject: Optional[str] = None,
+        num_questions: int = 5,
+        difficulty: Optional[str] = "mixed",
+        batch: Optional[Tuple[int, int]] = None
+    ) -> Dict[str, any]:
+        """
+        Generate practice questions from content
+
+        Args:
+            content: The study material content
+            subject: Subject area
+            num_questions: Number of questions to generate
+            difficulty: Difficulty level (easy/medium/hard/mixed)
+            batch: Optional (part, total) marker used by the parallel
+                path to keep sub-prompts distinct
+
+        Returns:
+            Dictionary containing questions and solutions
+        """
+        
+        difficulty_distribution = {
+            'easy': {'easy': num_questions, 'medium': 0, 'hard': 0},
+            'medium': {'easy': 0, 'medium': num_questions, 'hard': 0},
+            'hard': {'easy': 0, 'medium': 0, 'hard': num_questions},
+            'mixed': {
+                'easy': num_questions // 3 + (1 if num_questions % 3 > 0 else 0),
+                'medium': num_questions // 3 + (1 if num_questions % 3 > 1 else 0),
+                'hard': num_questions // 3
+            }
+        }
+        
+        dist = difficulty_distribution.get(difficulty, difficulty_distribution['mixed'])
+        
+        # All static scaffolding lives in SYSTEM_PROMPT; this only
+        # carries what changes per request, keeping the shared prefix
+        # cacheable. Content is truncated to a token budget so the model
+        # sees as much material as the context allows.
+        prompt = QUESTIONS_TEMPLATE.format_map({
+            'subject': subject or "General",
+            'easy': dist['easy'],
+            'medium': dist['medium'],
+            'hard': dist['hard'],
+            'batch': (
+                BATCH_LINE.format_map({'part': batch[0], 'total': batch[1]})
+                if batch else ''
+            ),
+            'content': truncate_tokens(content, 6000)
+        })
+
         try:
             response = self._get_ai_response(prompt)
-            
-            # Parse JSON response
-            # Clean up response if needed
-            response = response.strip()
-            if response.startswith('```json'):
-                response = response[7:]
-            if response.startswith('```'):
-                response = response[3:]
-            if response.endswith('```'):
-                response = response[:-3]
-            response = response.strip()
-            
-            questions_data = json.loads(response)
-            
+            questions_data = self._parse_json_response(response)
+
             return {
                 'success': True,
                 'questions': questions_data.get('questions', []),
@@ -144,6 +190,124 @@ class QuestionGenerator:
                 'error': str(e)
             }
     
+    def generate_questions_parallel(
+        self,
+        content: str,
+        subject: Optional[str] = None,
+        num_questions: int = 5,
+        difficulty: Optional[str] = "mixed"
+    ) -> Dict[str, any]:
+        """
+        Generate practice questions using concurrent batched calls
+
+        Splits the request into batches of at most 2 questions and fans
+        them out across threads, so wall-clock time is the slowest batch
+        rather than the sum of all batches. The AI clients are sync, so
+        threads stand in for an async gather here.
+
+        Args:
+            content: The study material content
+            subject: Subject area
+            num_questions: Number of questions to generate
+            difficulty: Difficulty level (easy/medium/hard/mixed)
+
+        Returns:
+            Dictionary containing questions and solutions
+        """
+        batches = self._question_batches(num_questions, difficulty)
+
+        if len(batches) == 1:
+            diff, count = batches[0]
+            return self.generate_questions(
+                content=content,
+                subject=subject,
+                num_questions=count,
+                difficulty=diff
+            )
+
+        with ThreadPoolExecutor(max_workers=min(8, len(batches))) as executor:
+            results = list(executor.map(
+                lambda numbered: self.generate_questions(
+                    content=content,
+                    subject=subject,
+                    num_questions=numbered[1][1],
+                    difficulty=numbered[1][0],
+                    batch=(numbered[0], len(batches))
+                ),
+                enumerate(batches, 1)
+            ))
+
+        # Merge, dropping repeats the model may still produce across
+        # batches despite the per-batch prompt marker
+        questions = []
+        errors = []
+        seen = set()
+        for result in results:
+            if not result.get('success'):
+                errors.append(result.get('error', 'Unknown error'))
+                continue
+            for question in result.get('questions', []):
+                text = str(question.get('question', '')).strip().lower()
+                if text in seen:
+                    continue
+                if text:
+                    seen.add(text)
+                questions.append(question)
+
+        if not questions:
+            return {
+                'success': False,
+                'error': errors[0] if errors else 'Failed to generate questions'
+            }
+
+        # Renumber across batches
+        for i, question in enumerate(questions, 1):
+            question['id'] = i
+
+        return {
+            'success': True,
+            'questions': questions,
+            'metadata': {
+                'total_questions': len(questions),
+                'subject': subject,
+                'difficulty': difficulty
+            }
+        }
+
+    @staticmethod
+    def _question_batches(num_questions: int, difficulty: str) -> List[Tuple[str, int]]:
+        """
+        Split a question request into batches of at most 2 questions
+
+        Mirrors the mixed-difficulty distribution used by
+        generate_questions so fan-out preserves the easy/medium/hard
+        split.
+
+        Args:
+            num_questions: Total number of questions requested
+            difficulty: Difficulty level (easy/medium/hard/mixed)
+
+        Returns:
+            List of (difficulty, count) batches
+        """
+        if difficulty == 'mixed':
+            counts = {
+                'easy': num_questions // 3 + (1 if num_questions % 3 > 0 else 0),
+                'medium': num_questions // 3 + (1 if num_questions % 3 > 1 else 0),
+                'hard': num_questions // 3
+            }
+        else:
+            counts = {difficulty: num_questions}
+
+        batches = []
+        for diff, count in counts.items():
+            while count > 0:
+                batch_size = min(2, count)
+                batches.append((diff, batch_size))
+                count -= batch_size
+
+        return batches
+
     def generate_single_question(
         self,
         topic: str,
@@ -162,34 +326,16 @@ class QuestionGenerator:
             Dictionary containing the question
         """
         
-        prompt = f"""Create ONE {difficulty} difficulty {question_type} question about: {topic}
-
-Return in this JSON format:
-{{
-  "question": "Question text?",
-  "type": "{question_type}",
-  "options": ["A) Option 1", "B) Option 2", "C) Option 3", "D) Option 4"],
-  "correct_answer": "Correct option",
-  "explanation": "Detailed step-by-step solution",
-  "hints": ["Hint 1", "Hint 2"]
-}}
-
-Make it exam-relevant and include a thorough explanation."""
+        prompt = SINGLE_QUESTION_TEMPLATE.format_map({
+            'difficulty': difficulty,
+            'question_type': question_type,
+            'topic': topic
+        })
 
         try:
             response = self._get_ai_response(prompt)
-            
-            # Clean and parse JSON
-            response = response.strip()
-            if response.startswith('```json'):
-                response = response[7:]
-            if response.startswith('```'):
-                response = response[3:]
-            if response.endswith('```'):
-                response = response[:-3]
-            
-            question = json.loads(response.strip())
-            
+            question = self._parse_json_response(response)
+
             return {
                 'success': True,
                 'question': question
@@ -201,26 +347,42 @@ Make it exam-relevant and include a thorough explanation."""
                 'error': str(e)
             }
     
+    @staticmethod
+    def _parse_json_response(response: str) -> Dict[str, any]:
+        """
+        Parse a JSON response, stripping markdown fences if present
+
+        Args:
+            response: Raw response text from the model
+
+        Returns:
+            Parsed JSON object
+        """
+        match = _JSON_FENCE_RE.match(response)
+        return json.loads(match.group(1) if match else response.strip())
+
     def _get_ai_response(self, prompt: str) -> str:
-        """Get response from AI client"""
-        if hasattr(self.ai_client, 'chat'):
-            # OpenAI
-            response = self.ai_client.chat.completions.create(
-                model=self.model_name,
-                messages=[
-                    {"role": "system", "content": "You are an expert at creating educational practice questions with detailed solutions."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.8,
-                max_tokens=3000
-            )
-            return response.choices[0].message.content
-        else:
-            # Anthropic
-            response = self.ai_client.messages.create(
-                model="claude-3-opus-20240229",
-                max_tokens=3000,
-                messages=[{"role": "user", "content": prompt}],
-                system="You are an expert at creating educational practice questions with detailed solutions."
-            )
-            return response.content[0].text
+        """Get response from AI client, consulting the exact-match cache"""
+        cache_key = None
+        if self.cache is not None:
+            cache_key = LLMCache.make_key(self.model_name, 0.8, self.SYSTEM_PROMPT, prompt)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        # JSON mode keeps the OpenAI path from wrapping the payload in
+        # markdown fences or prose, so parsing succeeds first try (every
+        # prompt here already mentions JSON, as the mode requires); the
+        # Anthropic provider ignores it
+        response_text = self._provider.complete(
+            prompt,
+            self.SYSTEM_PROMPT,
+            max_tokens=3000,
+            temperature=0.8,
+            response_format={"type": "json_object"}
+        )
+
+        if cache_key is not None:
+            self.cache.set(cache_key, response_text)
+
+        return response_text
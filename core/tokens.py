@@ -0,0 +1,55 @@
+"""Token-budget helpers for prompt construction"""
+from functools import lru_cache
+
+
+# Roughly four characters per token for the English-heavy text these
+# budgets guard; used whenever the real tokenizer is unavailable
+_CHARS_PER_TOKEN = 4
+
+
+@lru_cache(maxsize=4)
+def _encoding(model: str):
+    """Tokenizer for a model, or None if one can't be loaded"""
+    try:
+        import tiktoken
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding('cl100k_base')
+    except Exception:
+        # tiktoken fetches its BPE vocab over the network on first use,
+        # so a cold start without egress raises here at request time;
+        # degrade to the character budget instead of failing the call
+        return None
+
+
+def truncate_tokens(text: str, max_tokens: int, model: str = 'gpt-4o-mini') -> str:
+    """
+    Truncate text to a token budget instead of a character count
+
+    Character slicing wastes context on ASCII text (where characters far
+    outnumber tokens) and can blow past limits on token-dense text; this
+    cuts at the exact token boundary the model sees.
+
+    Args:
+        text: Text to truncate
+        max_tokens: Maximum number of tokens to keep
+        model: Model whose tokenizer defines the boundaries
+
+    Returns:
+        The text, truncated to at most max_tokens tokens
+    """
+    if not text:
+        return text
+
+    encoding = _encoding(model)
+    if encoding is not None:
+        try:
+            tokens = encoding.encode(text)
+            if len(tokens) <= max_tokens:
+                return text
+            return encoding.decode(tokens[:max_tokens])
+        except Exception:
+            pass
+
+    return text[:max_tokens * _CHARS_PER_TOKEN]
@@ -1,11 +1,39 @@
 """Document processor factory and manager"""
-from typing import Dict, Optional
+from concurrent.futures import ProcessPoolExecutor
+from functools import cached_property, partial
+from typing import Dict, List, Optional
+import asyncio
+import hashlib
+import multiprocessing
 import os
+
 from .pdf_processor import PDFProcessor
 from .docx_processor import DOCXProcessor
 from .pptx_processor import PPTXProcessor
 from .ocr_processor import OCRProcessor
 
+# Parsed results stay valid until the file content changes, so the TTL
+# only bounds how long stale entries linger on disk
+PARSE_CACHE_TTL = 7 * 24 * 3600
+
+
+def _process_one(file_path: str, tesseract_path: Optional[str], extract_structure: bool) -> Dict[str, any]:
+    """
+    Process a single file inside a worker process
+
+    Top-level so it pickles; processors are rebuilt in the worker rather
+    than shipped across the process boundary.
+
+    Args:
+        file_path: Path to the file
+        tesseract_path: Path to Tesseract executable for OCR
+        extract_structure: Whether to extract structured content
+
+    Returns:
+        Dictionary containing extracted content and metadata
+    """
+    return DocumentProcessor(tesseract_path).process_file(file_path, extract_structure)
+
 
 class DocumentProcessor:
     """Main document processor that routes to specific processors"""
@@ -17,60 +45,138 @@ class DocumentProcessor:
         Args:
             tesseract_path: Path to Tesseract executable for OCR
         """
-        self.pdf_processor = PDFProcessor()
-        self.docx_processor = DOCXProcessor()
-        self.pptx_processor = PPTXProcessor()
-        self.ocr_processor = OCRProcessor(tesseract_path)
-        
-        # Map file extensions to processors
+        self.tesseract_path = tesseract_path
+
+        # Map file extensions to processor attribute names; the
+        # processors themselves are cached_propertys built on first use,
+        # so e.g. the OCR stack never initializes for PDF-only workloads
         self.processor_map = {
-            '.pdf': self.pdf_processor,
-            '.docx': self.docx_processor,
-            '.doc': self.docx_processor,
-            '.pptx': self.pptx_processor,
-            '.ppt': self.pptx_processor,
-            '.jpg': self.ocr_processor,
-            '.jpeg': self.ocr_processor,
-            '.png': self.ocr_processor,
-            '.bmp': self.ocr_processor,
-            '.tiff': self.ocr_processor,
-            '.gif': self.ocr_processor
+            '.pdf': 'pdf_processor',
+            '.docx': 'docx_processor',
+            '.doc': 'docx_processor',
+            '.pptx': 'pptx_processor',
+            '.ppt': 'pptx_processor',
+            '.jpg': 'ocr_processor',
+            '.jpeg': 'ocr_processor',
+            '.png': 'ocr_processor',
+            '.bmp': 'ocr_processor',
+            '.tiff': 'ocr_processor',
+            '.gif': 'ocr_processor'
         }
+
+    @cached_property
+    def pdf_processor(self) -> PDFProcessor:
+        """PDF processor, constructed lazily on first use"""
+        return PDFProcessor()
+
+    @cached_property
+    def docx_processor(self) -> DOCXProcessor:
+        """DOCX processor, constructed lazily on first use"""
+        return DOCXProcessor()
+
+    @cached_property
+    def pptx_processor(self) -> PPTXProcessor:
+        """PPTX processor, constructed lazily on first use"""
+        return PPTXProcessor()
+
+    @cached_property
+    def ocr_processor(self) -> OCRProcessor:
+        """OCR processor, constructed lazily on first use"""
+        return OCRProcessor(self.tesseract_path)
     
-    def process_file(self, file_path: str, extract_structure: bool = True) -> Dict[str, any]:
+    @cached_property
+    def _parse_cache(self):
+        """Disk-backed cache of parse results, keyed by file content"""
+        from diskcache import Cache
+        return Cache(
+            os.getenv('PARSE_CACHE_DIR', '.parse_cache'),
+            size_limit=int(1e9)
+        )
+
+    @staticmethod
+    def _fingerprint(file_path: str) -> str:
+        """
+        Cheap content fingerprint for the parse cache
+
+        Hashes the first 64KB plus the file size; small files (<1MB) are
+        hashed in full since reading them costs nothing.
+
+        Args:
+            file_path: Path to the file
+
+        Returns:
+            Hex digest identifying the file's content
+        """
+        size = os.path.getsize(file_path)
+        digest = hashlib.blake2b(digest_size=16)
+        with open(file_path, 'rb') as f:
+            digest.update(f.read() if size < 1024 * 1024 else f.read(65536))
+        digest.update(str(size).encode('ascii'))
+        return digest.hexdigest()
+
+    def process_file(
+        self,
+        file_path: str,
+        extract_structure: bool = True,
+        bypass_cache: bool = False
+    ) -> Dict[str, any]:
         """
         Process a file and extract its content
-        
+
+        Results are cached on disk keyed by file content, so reprocessing
+        the same document (notes, then questions, then explanations)
+        skips the extraction pipeline entirely.
+
         Args:
             file_path: Path to the file
             extract_structure: Whether to extract structured content
-            
+            bypass_cache: Force a fresh parse even on a cache hit
+
         Returns:
             Dictionary containing extracted content and metadata
         """
         # Get file extension
         _, ext = os.path.splitext(file_path.lower())
-        
+
         # Get appropriate processor
-        processor = self.processor_map.get(ext)
-        
+        processor_name = self.processor_map.get(ext)
+        processor = getattr(self, processor_name) if processor_name else None
+
         if not processor:
             return {
                 'success': False,
                 'error': f'Unsupported file format: {ext}',
                 'file_path': file_path
             }
-        
+
+        cache_key = None
+        if not bypass_cache:
+            try:
+                cache_key = (self._fingerprint(file_path), extract_structure)
+                cached = self._parse_cache.get(cache_key)
+                if cached is not None:
+                    cached['file_path'] = file_path
+                    return cached
+            except Exception:
+                cache_key = None
+
         # Process file
         try:
             if extract_structure and hasattr(processor, 'extract_with_structure'):
                 result = processor.extract_with_structure(file_path)
             else:
                 result = processor.extract_text(file_path)
-            
+
             result['file_path'] = file_path
+
+            if cache_key is not None and result.get('success'):
+                try:
+                    self._parse_cache.set(cache_key, result, expire=PARSE_CACHE_TTL)
+                except Exception as e:
+                    print(f"Parse cache write failed: {e}")
+
             return result
-            
+
         except Exception as e:
             return {
                 'success': False,
@@ -78,6 +184,55 @@ class DocumentProcessor:
                 'file_path': file_path
             }
     
+    def process_files(self, file_paths: List[str], extract_structure: bool = True) -> List[Dict[str, any]]:
+        """
+        Process multiple files in parallel across CPU cores
+
+        Parsing and OCR are CPU-bound, so each file is handled in its own
+        worker process. Results come back in input order.
+
+        Args:
+            file_paths: Paths to the files
+            extract_structure: Whether to extract structured content
+
+        Returns:
+            List of result dictionaries, one per file, in input order
+        """
+        if not file_paths:
+            return []
+
+        if len(file_paths) == 1:
+            return [self.process_file(file_paths[0], extract_structure)]
+
+        worker = partial(
+            _process_one,
+            tesseract_path=self.tesseract_path,
+            extract_structure=extract_structure
+        )
+
+        # spawn avoids fork-related issues in the imaging libraries
+        with ProcessPoolExecutor(
+            max_workers=min(len(file_paths), os.cpu_count() or 1),
+            mp_context=multiprocessing.get_context('spawn')
+        ) as executor:
+            return list(executor.map(worker, file_paths))
+
+    async def process_file_async(self, file_path: str, extract_structure: bool = True) -> Dict[str, any]:
+        """
+        Process a file without blocking the event loop
+
+        Extraction (and OCR in particular) is CPU-bound, so async callers
+        should use this instead of calling process_file directly.
+
+        Args:
+            file_path: Path to the file
+            extract_structure: Whether to extract structured content
+
+        Returns:
+            Dictionary containing extracted content and metadata
+        """
+        return await asyncio.to_thread(self.process_file, file_path, extract_structure)
+
     def get_supported_formats(self) -> list:
         """Get list of all supported file formats"""
         return list(self.processor_map.keys())
@@ -1,48 +1,123 @@
 """DOCX document processing and text extraction"""
-from docx import Document
-from typing import Dict, List
+import io
 import os
+import zipfile
+from functools import cache
+from typing import Dict, List
+
+from utils.file_meta import gather_meta
+
+# WordprocessingML namespace for the tags streamed out of document.xml
+_W_NS = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+_P_TAG = f'{{{_W_NS}}}p'
+_SECT_TAG = f'{{{_W_NS}}}sectPr'
+_T_TAG = f'{{{_W_NS}}}t'
+_DEL_TAG = f'{{{_W_NS}}}del'
+
+# mc:Fallback duplicates mc:Choice content (e.g. textbox paragraphs),
+# so paragraphs under it are skipped to avoid emitting text twice
+_MC_NS = 'http://schemas.openxmlformats.org/markup-compatibility/2006'
+_FALLBACK_TAG = f'{{{_MC_NS}}}Fallback'
+
+
+def _skip_paragraph(elem) -> bool:
+    """Whether a w:p sits in a subtree python-docx would not surface"""
+    parent = elem.getparent()
+    while parent is not None:
+        if parent.tag == _FALLBACK_TAG or parent.tag == _DEL_TAG:
+            return True
+        parent = parent.getparent()
+    return False
+
+
+# Backends load on first extraction rather than at import, keeping them
+# off the cold-start path for requests that never touch a Word document
+@cache
+def _etree():
+    from lxml import etree
+    return etree
+
+
+@cache
+def _document():
+    from docx import Document
+    return Document
 
 
 class DOCXProcessor:
     """Handles Word document processing and text extraction"""
-    
+
     def __init__(self):
         self.supported_formats = ['.docx', '.doc']
-    
-    def extract_text(self, file_path: str) -> Dict[str, any]:
+
+    def extract_text(self, file_path: str, include_paragraphs: bool = False) -> Dict[str, any]:
         """
         Extract text from DOCX file
-        
+
+        Streams paragraphs straight out of word/document.xml with
+        iterparse instead of materializing the full python-docx Document
+        tree, so memory stays flat on large files. Text accumulates in a
+        StringIO so the paragraph list and joined text never coexist;
+        pass include_paragraphs=True to also get the list.
+
         Args:
             file_path: Path to DOCX file
-            
+            include_paragraphs: Whether to also return the paragraph list
+
         Returns:
             Dictionary containing extracted text and metadata
         """
         try:
-            doc = Document(file_path)
-            
-            # Extract metadata
+            buffer = io.StringIO()
+            paragraphs = [] if include_paragraphs else None
+            num_paragraphs = 0
+            num_sections = 0
+
+            with zipfile.ZipFile(file_path) as archive:
+                with archive.open('word/document.xml') as stream:
+                    for _, elem in _etree().iterparse(
+                        stream, events=('end',), tag=(_P_TAG, _SECT_TAG)
+                    ):
+                        if elem.tag == _SECT_TAG:
+                            num_sections += 1
+                        elif not _skip_paragraph(elem):
+                            num_paragraphs += 1
+                            # Only w:t carries displayed run text;
+                            # itertext would also pull in field
+                            # instructions (w:instrText) and deleted
+                            # tracked-change text (w:delText)
+                            text = ''.join(
+                                t.text for t in elem.iter(_T_TAG) if t.text
+                            )
+                            if text.strip():
+                                if buffer.tell():
+                                    buffer.write('\n\n')
+                                buffer.write(text)
+                                if paragraphs is not None:
+                                    paragraphs.append(text)
+                        if elem.tag == _P_TAG:
+                            # Release the processed subtree so memory
+                            # stays O(paragraph), not O(document)
+                            elem.clear()
+                            while elem.getprevious() is not None:
+                                del elem.getparent()[0]
+
             metadata = {
-                'file_name': os.path.basename(file_path),
-                'file_size': os.path.getsize(file_path),
-                'num_paragraphs': len(doc.paragraphs),
-                'num_sections': len(doc.sections)
+                **gather_meta(file_path),
+                'num_paragraphs': num_paragraphs,
+                'num_sections': num_sections
             }
-            
-            # Extract text
-            paragraphs = [para.text for para in doc.paragraphs if para.text.strip()]
-            full_text = '\n\n'.join(paragraphs)
-            
-            return {
+
+            result = {
                 'success': True,
-                'full_text': full_text,
-                'paragraphs': paragraphs,
+                'full_text': buffer.getvalue(),
                 'metadata': metadata,
                 'format': 'docx'
             }
-            
+            if paragraphs is not None:
+                result['paragraphs'] = paragraphs
+            return result
+
         except Exception as e:
             return {
                 'success': False,
@@ -61,7 +136,7 @@ class DOCXProcessor:
             Dictionary with structured content
         """
         try:
-            doc = Document(file_path)
+            doc = _document()(file_path)
             
             structured_content = []
             current_section = None
@@ -1,8 +1,33 @@
 """PDF text extraction and processing"""
-import PyPDF2
+from concurrent.futures import ThreadPoolExecutor
+
+from functools import cache
 from typing import Dict, List
+import mmap
 import os
 
+from utils.file_meta import gather_meta
+from utils.structure import build_sections
+
+
+# Backends load on first extraction rather than at import, keeping PDF
+# parsing off the cold-start path for requests that never touch a PDF
+@cache
+def _pypdf2():
+    import PyPDF2
+    return PyPDF2
+
+
+@cache
+def _pdfium():
+    # pdfium is a C++ engine roughly 5-10x faster than pure-Python
+    # PyPDF2; used when available, with PyPDF2 as the fallback extractor
+    try:
+        import pypdfium2
+    except ImportError:
+        return None
+    return pypdfium2
+
 
 class PDFProcessor:
     """Handles PDF document processing and text extraction"""
@@ -10,47 +35,45 @@ class PDFProcessor:
     def __init__(self):
         self.supported_formats = ['.pdf']
     
-    def extract_text(self, file_path: str) -> Dict[str, any]:
+    def extract_text(self, file_path: str, return_pages: bool = False) -> Dict[str, any]:
         """
         Extract text from PDF file
-        
+
         Args:
             file_path: Path to PDF file
-            
+            return_pages: Whether to also return per-page text dicts
+
         Returns:
             Dictionary containing extracted text and metadata
         """
         try:
-            with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                
-                # Extract metadata
-                metadata = {
-                    'num_pages': len(pdf_reader.pages),
-                    'file_name': os.path.basename(file_path),
-                    'file_size': os.path.getsize(file_path)
-                }
-                
-                # Extract text from all pages
-                full_text = []
-                page_texts = []
-                
-                for page_num, page in enumerate(pdf_reader.pages, 1):
-                    text = page.extract_text()
-                    page_texts.append({
-                        'page_number': page_num,
-                        'text': text
-                    })
-                    full_text.append(text)
-                
-                return {
-                    'success': True,
-                    'full_text': '\n\n'.join(full_text),
-                    'pages': page_texts,
-                    'metadata': metadata,
-                    'format': 'pdf'
-                }
-                
+            texts = (
+                self._extract_pages_pdfium(file_path) if _pdfium()
+                else self._extract_pages_pypdf(file_path)
+            )
+
+            metadata = {
+                'num_pages': len(texts),
+                **gather_meta(file_path)
+            }
+
+            result = {
+                'success': True,
+                'full_text': '\n\n'.join(texts),
+                'metadata': metadata,
+                'format': 'pdf'
+            }
+
+            # The per-page copy of every page's text doubles the
+            # payload, so it's only built for callers that want it
+            if return_pages:
+                result['pages'] = [
+                    {'page_number': page_num, 'text': text}
+                    for page_num, text in enumerate(texts, 1)
+                ]
+
+            return result
+
         except Exception as e:
             return {
                 'success': False,
@@ -58,6 +81,67 @@ class PDFProcessor:
                 'format': 'pdf'
             }
     
+    @staticmethod
+    def _extract_pages_pdfium(file_path: str) -> List[str]:
+        """
+        Extract per-page text with pdfium
+
+        Args:
+            file_path: Path to PDF file
+
+        Returns:
+            List of page texts in page order
+        """
+        pdf = _pdfium().PdfDocument(file_path)
+        try:
+            # A serial loop over the C++ extractor still comfortably
+            # beats the threaded PyPDF2 path; pdfium itself is not safe
+            # to share across threads for one document
+            texts = []
+            for page in pdf:
+                textpage = page.get_textpage()
+                texts.append(textpage.get_text_range())
+                textpage.close()
+                page.close()
+            return texts
+        finally:
+            pdf.close()
+
+    @staticmethod
+    def _extract_pages_pypdf(file_path: str) -> List[str]:
+        """
+        Extract per-page text with PyPDF2
+
+        Args:
+            file_path: Path to PDF file
+
+        Returns:
+            List of page texts in page order
+        """
+        # Memory-map the file instead of letting PyPDF2 read it all
+        # into RAM; the OS pages bytes in on demand, which keeps RSS
+        # flat for large PDFs
+        with open(file_path, 'rb') as file, \
+                mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            num_pages = len(_pypdf2().PdfReader(mm).pages)
+
+        def extract_page(page_num: int) -> str:
+            # PyPDF2 readers are not thread-safe (object resolution
+            # seeks the shared stream), so each worker builds its own
+            # reader over its own mmap -- cheap next to extraction
+            with open(file_path, 'rb') as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                return _pypdf2().PdfReader(m).pages[page_num].extract_text()
+
+        # Extract pages concurrently; per-page extraction is independent
+        # and spends much of its time in code that releases the GIL, so
+        # order-preserving map over a small pool beats the serial loop
+        # on multi-page documents
+        if num_pages > 1:
+            with ThreadPoolExecutor(max_workers=min(8, num_pages)) as executor:
+                return list(executor.map(extract_page, range(num_pages)))
+        return [extract_page(page_num) for page_num in range(num_pages)]
+
     def extract_with_structure(self, file_path: str) -> Dict[str, any]:
         """
         Extract text with structural information (headings, paragraphs)
@@ -74,27 +158,7 @@ class PDFProcessor:
             return result
         
         # Basic structure detection
-        text = result['full_text']
-        lines = text.split('\n')
-        
-        structured_content = []
-        current_section = {'heading': 'Introduction', 'content': []}
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            
-            # Simple heuristic: short lines in ALL CAPS or title case might be headings
-            if len(line) < 100 and (line.isupper() or line.istitle()):
-                if current_section['content']:
-                    structured_content.append(current_section)
-                current_section = {'heading': line, 'content': []}
-            else:
-                current_section['content'].append(line)
-        
-        if current_section['content']:
-            structured_content.append(current_section)
-        
-        result['structured_content'] = structured_content
+        result['structured_content'] = build_sections(
+            result['full_text'].split('\n')
+        )
         return result
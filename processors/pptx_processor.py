@@ -1,8 +1,18 @@
 """PowerPoint presentation processing and text extraction"""
-from pptx import Presentation
+from functools import cache
 from typing import Dict, List
 import os
 
+from utils.file_meta import gather_meta
+
+
+# python-pptx loads on first extraction rather than at import, keeping
+# it off the cold-start path for requests that never touch a deck
+@cache
+def _presentation():
+    from pptx import Presentation
+    return Presentation
+
 
 class PPTXProcessor:
     """Handles PowerPoint presentation processing and text extraction"""
@@ -21,12 +31,11 @@ class PPTXProcessor:
             Dictionary containing extracted text and metadata
         """
         try:
-            prs = Presentation(file_path)
+            prs = _presentation()(file_path)
             
             # Extract metadata
             metadata = {
-                'file_name': os.path.basename(file_path),
-                'file_size': os.path.getsize(file_path),
+                **gather_meta(file_path),
                 'num_slides': len(prs.slides)
             }
             
@@ -37,24 +46,28 @@ class PPTXProcessor:
             for slide_num, slide in enumerate(prs.slides, 1):
                 slide_text = []
                 slide_title = ""
-                
+
                 for shape in slide.shapes:
-                    if hasattr(shape, "text") and shape.text.strip():
-                        text = shape.text.strip()
-                        slide_text.append(text)
-                        
-                        # First text box is usually the title
-                        if not slide_title and shape.has_text_frame:
-                            slide_title = text
-                
+                    # Strip once per shape; shape.text walks the XML tree
+                    # on every access, so it's not free to call twice
+                    text = shape.text.strip() if hasattr(shape, "text") else ""
+                    if not text:
+                        continue
+                    slide_text.append(text)
+
+                    # First text box is usually the title
+                    if not slide_title and shape.has_text_frame:
+                        slide_title = text
+
+                slide_full = '\n'.join(slide_text)
                 slides_content.append({
                     'slide_number': slide_num,
                     'title': slide_title,
                     'content': slide_text,
-                    'full_text': '\n'.join(slide_text)
+                    'full_text': slide_full
                 })
-                
-                full_text.append(f"Slide {slide_num}: {slide_title}\n" + '\n'.join(slide_text))
+
+                full_text.append(f"Slide {slide_num}: {slide_title}\n{slide_full}")
             
             return {
                 'success': True,
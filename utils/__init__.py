@@ -1,11 +1,17 @@
 """Utility modules"""
 from .formatters import ResponseFormatter, EmojiHelper, MarkdownHelper
 from .validators import FileValidator, InputValidator
+from .cache import LRUCache
+from .structure import build_sections
+from .file_meta import gather_meta
 
 __all__ = [
     'ResponseFormatter',
     'EmojiHelper',
     'MarkdownHelper',
     'FileValidator',
-    'InputValidator'
+    'InputValidator',
+    'LRUCache',
+    'build_sections',
+    'gather_meta'
 ]
@@ -0,0 +1,57 @@
+"""Lightweight caching utilities"""
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+class LRUCache:
+    """Bounded least-recently-used cache
+
+    Thin wrapper around OrderedDict that evicts the least recently used
+    entry once the cache grows past maxsize. Supports dict-style access
+    so it can drop in for plain dict caches.
+    """
+
+    def __init__(self, maxsize: int = 128):
+        """
+        Initialize the cache
+
+        Args:
+            maxsize: Maximum number of entries to retain
+        """
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+
+    def get(self, key, default=None) -> Optional[Any]:
+        """Get a value, refreshing its recency; return default on miss"""
+        if key not in self._data:
+            return default
+        self._data.move_to_end(key)
+        return self._data[key]
+
+    def set(self, key, value):
+        """Store a value, evicting the oldest entry if over capacity"""
+        if key in self._data:
+            self._data.move_to_end(key)
+        self._data[key] = value
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def __getitem__(self, key):
+        self._data.move_to_end(key)
+        return self._data[key]
+
+    def __setitem__(self, key, value):
+        self.set(key, value)
+
+    def __delitem__(self, key):
+        del self._data[key]
+
+    def __contains__(self, key) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def clear(self):
+        """Remove all entries"""
+        self._data.clear()
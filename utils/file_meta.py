@@ -0,0 +1,23 @@
+"""Single-stat file metadata shared by the document processors"""
+import os
+from typing import Dict
+
+
+def gather_meta(file_path: str) -> Dict[str, any]:
+    """
+    Collect basic file metadata with one stat call
+
+    The processors previously paired os.path.getsize with
+    os.path.basename per file; getsize is a full stat, so batch
+    workflows paid one syscall per field. This keeps it to one.
+
+    Args:
+        file_path: Path to the file
+
+    Returns:
+        Dictionary with 'file_name' and 'file_size'
+    """
+    return {
+        'file_name': os.path.basename(file_path),
+        'file_size': os.stat(file_path).st_size
+    }
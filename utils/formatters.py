@@ -1,7 +1,16 @@
 """Formatting utilities for study notes and responses"""
 import re
+from functools import lru_cache
 from typing import Dict, List
 
+# Compiled once; format_notes runs on every AI response
+_HEAD_SP_RE = re.compile(r'\n(#{1,6}\s)')
+_HEAD_TRAIL_RE = re.compile(r'(#{1,6}\s[^\n]+)\n')
+_EMOJI_RE = re.compile(r'([⭐⚠️🧠])\s*\*\*')
+
+# Summary-box horizontal rule, built once rather than per render
+_BOX_RULE = '=' * 60
+
 
 class ResponseFormatter:
     """Formats AI responses for better readability"""
@@ -17,16 +26,13 @@ class ResponseFormatter:
         Returns:
             Formatted notes
         """
-        # Ensure consistent formatting
-        formatted = notes
-        
         # Add spacing around headings
-        formatted = re.sub(r'\n(#{1,6}\s)', r'\n\n\1', formatted)
-        formatted = re.sub(r'(#{1,6}\s[^\n]+)\n', r'\1\n\n', formatted)
-        
+        formatted = _HEAD_SP_RE.sub(r'\n\n\1', notes)
+        formatted = _HEAD_TRAIL_RE.sub(r'\1\n\n', formatted)
+
         # Ensure emoji markers are properly spaced
-        formatted = re.sub(r'([⭐⚠️🧠])\s*\*\*', r'\1 **', formatted)
-        
+        formatted = _EMOJI_RE.sub(r'\1 **', formatted)
+
         return formatted.strip()
     
     @staticmethod
@@ -108,13 +114,10 @@ class ResponseFormatter:
         Returns:
             Formatted box
         """
-        box = f"\n{'='*60}\n"
-        box += f"  {title.upper()}\n"
-        box += f"{'='*60}\n\n"
-        box += content
-        box += f"\n{'='*60}\n"
-        
-        return box
+        return (
+            f"\n{_BOX_RULE}\n  {title.upper()}\n{_BOX_RULE}\n\n"
+            f"{content}\n{_BOX_RULE}\n"
+        )
 
 
 class EmojiHelper:
@@ -134,42 +137,53 @@ class EmojiHelper:
     FIRE = "🔥"
     SPARKLES = "✨"
     
+    # Built once at class creation instead of per call
+    _DIFFICULTY_MAP = {
+        'easy': '🟢',
+        'medium': '🟡',
+        'hard': '🔴'
+    }
+
+    _SUBJECT_MAP = {
+        'math': '🔢',
+        'mathematics': '🔢',
+        'science': '🔬',
+        'physics': '⚛️',
+        'chemistry': '🧪',
+        'biology': '🧬',
+        'history': '📜',
+        'english': '📖',
+        'literature': '📚',
+        'computer': '💻',
+        'programming': '💻',
+        'art': '🎨',
+        'music': '🎵'
+    }
+
     @classmethod
     def get_difficulty_emoji(cls, difficulty: str) -> str:
         """Get emoji for difficulty level"""
-        mapping = {
-            'easy': '🟢',
-            'medium': '🟡',
-            'hard': '🔴'
-        }
-        return mapping.get(difficulty.lower(), '⚪')
-    
+        return cls._DIFFICULTY_MAP.get(difficulty.lower(), '⚪')
+
     @classmethod
     def get_subject_emoji(cls, subject: str) -> str:
         """Get emoji for subject"""
-        subject_lower = subject.lower() if subject else ''
-        
-        mapping = {
-            'math': '🔢',
-            'mathematics': '🔢',
-            'science': '🔬',
-            'physics': '⚛️',
-            'chemistry': '🧪',
-            'biology': '🧬',
-            'history': '📜',
-            'english': '📖',
-            'literature': '📚',
-            'computer': '💻',
-            'programming': '💻',
-            'art': '🎨',
-            'music': '🎵'
-        }
-        
-        for key, emoji in mapping.items():
-            if key in subject_lower:
-                return emoji
-        
-        return '📚'
+        return _subject_emoji(subject.lower() if subject else '')
+
+
+@lru_cache(maxsize=256)
+def _subject_emoji(subject_lower: str) -> str:
+    """Resolve a lowercased subject string to its emoji"""
+    # Priority-ordered substring scan, matching the map's insertion
+    # order: a leftmost-position regex would let 'art' inside
+    # "e-art-h science" beat 'science'
+    return next(
+        (
+            emoji for key, emoji in EmojiHelper._SUBJECT_MAP.items()
+            if key in subject_lower
+        ),
+        '📚'
+    )
 
 
 class MarkdownHelper:
@@ -200,17 +214,25 @@ class MarkdownHelper:
     @staticmethod
     def bullet_list(items: List[str]) -> str:
         """Create bullet list"""
-        return '\n'.join(f"- {item}" for item in items) + '\n\n'
-    
+        if not items:
+            return '\n\n'
+        # Single join with the prefix baked into the separator: one
+        # output string instead of a formatted intermediate per item
+        return '- ' + '\n- '.join(items) + '\n\n'
+
     @staticmethod
     def numbered_list(items: List[str]) -> str:
         """Create numbered list"""
-        return '\n'.join(f"{i}. {item}" for i, item in enumerate(items, 1)) + '\n\n'
-    
+        if not items:
+            return '\n\n'
+        return '\n'.join(
+            map('{0}. {1}'.format, range(1, len(items) + 1), items)
+        ) + '\n\n'
+
     @staticmethod
     def quote(text: str) -> str:
         """Create block quote"""
-        return '\n'.join(f"> {line}" for line in text.split('\n')) + '\n\n'
+        return '> ' + text.replace('\n', '\n> ') + '\n\n'
     
     @staticmethod
     def divider() -> str:
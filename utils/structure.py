@@ -0,0 +1,71 @@
+"""Shared structure detection for extracted document text"""
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+
+# Large documents repeat the same lines constantly (running headers,
+# footers, slide titles), so memoizing the per-line classification
+# skips the str-method work for every repeat
+@lru_cache(maxsize=4096)
+def is_heading(line: str, title_max_words: Optional[int] = None) -> bool:
+    """
+    Heuristic check for whether a line is a section heading
+
+    Short lines in ALL CAPS or Title Case are treated as headings,
+    optionally capped at a maximum word count for the Title Case form.
+
+    Args:
+        line: A stripped, non-empty line of text
+        title_max_words: Maximum words for a Title Case heading
+            (None for no limit)
+
+    Returns:
+        True if the line looks like a heading
+    """
+    if len(line) >= 100:
+        return False
+    if line.isupper():
+        return True
+    if not line.istitle():
+        return False
+    # count(' ') + 1 words without materializing a split list; callers
+    # pass stripped lines so separators are single spaces
+    return title_max_words is None or line.count(' ') < title_max_words
+
+
+def build_sections(
+    lines: List[str],
+    default_heading: str = 'Introduction',
+    title_max_words: Optional[int] = None
+) -> List[Dict[str, any]]:
+    """
+    Group lines of text into heading/content sections
+
+    Args:
+        lines: Lines of extracted text
+        default_heading: Heading for content before the first heading
+        title_max_words: Maximum words for a Title Case heading
+            (None for no limit)
+
+    Returns:
+        List of {'heading': ..., 'content': [...]} sections
+    """
+    structured_content = []
+    current_section = {'heading': default_heading, 'content': []}
+
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+
+        if is_heading(line, title_max_words):
+            if current_section['content']:
+                structured_content.append(current_section)
+            current_section = {'heading': line, 'content': []}
+        else:
+            current_section['content'].append(line)
+
+    if current_section['content']:
+        structured_content.append(current_section)
+
+    return structured_content
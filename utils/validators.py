@@ -1,17 +1,26 @@
 """Input validation utilities"""
 from typing import List, Optional
 import os
+import re
+
+# Control characters stripped from user text (tab/newline/CR kept;
+# sanitized text feeds prompts, not HTML, so < and > stay). Compiled
+# once at import so each sanitize call is a single C-level scan
+_UNSAFE_CHARS_RE = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f]')
 
 
 class FileValidator:
     """Validates uploaded files"""
     
-    # Supported file extensions
-    SUPPORTED_EXTENSIONS = [
+    # Supported file extensions; frozenset for O(1) membership tests
+    SUPPORTED_EXTENSIONS = frozenset({
         '.pdf', '.docx', '.doc', '.pptx', '.ppt',
         '.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.gif'
-    ]
-    
+    })
+
+    # Stable list form for JSON payloads (sets don't serialize)
+    SUPPORTED_EXTENSIONS_LIST = sorted(SUPPORTED_EXTENSIONS)
+
     # Max file size in bytes (default 10MB)
     MAX_FILE_SIZE = 10 * 1024 * 1024
     
@@ -33,41 +42,44 @@ class FileValidator:
             Validation result dictionary
         """
         max_size = max_size or cls.MAX_FILE_SIZE
-        
-        # Check file exists
-        if not os.path.exists(file_path):
+
+        # One stat call covers both the existence and the size check
+        try:
+            file_size = os.stat(file_path).st_size
+        except (FileNotFoundError, NotADirectoryError):
             return {
                 'valid': False,
                 'error': 'File does not exist'
             }
-        
+        except OSError as e:
+            return {
+                'valid': False,
+                'error': f'File not readable: {str(e)}'
+            }
+
         # Check file extension
         _, ext = os.path.splitext(file_path.lower())
         if ext not in cls.SUPPORTED_EXTENSIONS:
             return {
                 'valid': False,
                 'error': f'Unsupported file format: {ext}',
-                'supported_formats': cls.SUPPORTED_EXTENSIONS
+                'supported_formats': cls.SUPPORTED_EXTENSIONS_LIST
             }
-        
+
         # Check file size
-        file_size = os.path.getsize(file_path)
         if file_size > max_size:
             return {
                 'valid': False,
                 'error': f'File too large: {file_size} bytes (max: {max_size} bytes)'
             }
-        
-        # Check if file is readable
-        try:
-            with open(file_path, 'rb') as f:
-                f.read(1)
-        except Exception as e:
+
+        # Check if file is readable without opening it
+        if not os.access(file_path, os.R_OK):
             return {
                 'valid': False,
-                'error': f'File not readable: {str(e)}'
+                'error': 'File not readable: permission denied'
             }
-        
+
         return {
             'valid': True,
             'file_path': file_path,
@@ -115,10 +127,15 @@ class FileValidator:
 class InputValidator:
     """Validates user inputs"""
     
-    VALID_LEVELS = ['beginner', 'intermediate', 'advanced']
-    VALID_DIFFICULTIES = ['easy', 'medium', 'hard', 'mixed']
-    VALID_FOCUS_TYPES = ['concept-oriented', 'exam-oriented']
-    
+    VALID_LEVELS = frozenset({'beginner', 'intermediate', 'advanced'})
+    VALID_DIFFICULTIES = frozenset({'easy', 'medium', 'hard', 'mixed'})
+    VALID_FOCUS_TYPES = frozenset({'concept-oriented', 'exam-oriented'})
+
+    # Precomputed list forms for error payloads (sets don't serialize)
+    _VALID_LEVELS_LIST = sorted(VALID_LEVELS)
+    _VALID_DIFFICULTIES_LIST = sorted(VALID_DIFFICULTIES)
+    _VALID_FOCUS_TYPES_LIST = sorted(VALID_FOCUS_TYPES)
+
     @classmethod
     def validate_level(cls, level: str) -> dict:
         """Validate academic level"""
@@ -128,7 +145,7 @@ class InputValidator:
             return {
                 'valid': False,
                 'error': f'Invalid level: {level}',
-                'valid_options': cls.VALID_LEVELS,
+                'valid_options': cls._VALID_LEVELS_LIST,
                 'default': 'intermediate'
             }
         
@@ -146,7 +163,7 @@ class InputValidator:
             return {
                 'valid': False,
                 'error': f'Invalid difficulty: {difficulty}',
-                'valid_options': cls.VALID_DIFFICULTIES,
+                'valid_options': cls._VALID_DIFFICULTIES_LIST,
                 'default': 'mixed'
             }
         
@@ -164,7 +181,7 @@ class InputValidator:
             return {
                 'valid': False,
                 'error': f'Invalid focus: {focus}',
-                'valid_options': cls.VALID_FOCUS_TYPES,
+                'valid_options': cls._VALID_FOCUS_TYPES_LIST,
                 'default': 'concept-oriented'
             }
         
@@ -219,12 +236,12 @@ class InputValidator:
         """
         if not text:
             return ""
-        
-        # Remove leading/trailing whitespace
-        text = text.strip()
-        
+
+        # Strip control characters and surrounding whitespace
+        text = _UNSAFE_CHARS_RE.sub('', text).strip()
+
         # Limit length if specified
         if max_length and len(text) > max_length:
             text = text[:max_length]
-        
+
         return text